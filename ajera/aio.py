@@ -0,0 +1,272 @@
+import asyncio
+import datetime
+from contextlib import asynccontextmanager
+from .ajera import _RETRYABLE, _merge_chunks
+from .decode import decoder
+from .errors import AjeraError, AjeraHTTPError, AjeraSessionError
+from .model import (
+    _GET_PROJECTS_LIMIT,
+    CreateSession,
+    CreateSessionContent,
+    EndSession,
+    GetProjects,
+    GetProjectsArgs,
+    GetProjectsBatchContent,
+    GetProjectsChunkFailure,
+    GetProjectsResponse,
+    ListProjects,
+    ListProjectsArgs,
+    ListProjectsResponse,
+)
+from .projection import projected_request
+from .transport import _HEADERS, _READ_METHODS, _RETRY_STATUSES
+
+
+class AsyncTransport:
+    """Keep-alive asyncio HTTP transport for AjeraRequest.apost (needs httpx)
+
+    Any object with an ``async post(url, json) -> bytes`` method can stand in
+    for it.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = 10,
+        timeout: float = 300.0,
+        connect_timeout: float = 10.0,
+        retries: int = 3,
+        backoff_factor: float = 0.5,  # sleeps 0.5s, 1s, 2s, ... between retries
+    ):
+        try:
+            import httpx
+        except ImportError as e:
+            raise ImportError("AsyncTransport requires httpx") from e
+
+        self._httpx = httpx
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.client = httpx.AsyncClient(
+            headers=_HEADERS,
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+            limits=httpx.Limits(
+                max_connections=pool_size, max_keepalive_connections=pool_size
+            ),
+        )
+
+    async def post(self, url: str, json: dict) -> bytes:
+        """POST a JSON payload and return the (decompressed) response body
+
+        Like Transport.post, only read methods are resent after errors.
+        """
+        retries = self.retries if json.get("Method") in _READ_METHODS else 0
+        for attempt in range(retries + 1):
+            try:
+                response = await self.client.post(url, json=json)
+            except self._httpx.TransportError as e:
+                if attempt == retries:
+                    # an OSError, like the network errors of the sync Transport
+                    raise ConnectionError(e) from e
+            else:
+                if response.status_code not in _RETRY_STATUSES or attempt == retries:
+                    if response.status_code >= 400:
+                        raise AjeraHTTPError(json.get("Method"), response.status_code)
+                    return response.content
+            await asyncio.sleep(self.backoff_factor * 2**attempt)
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+class AsyncAjera:
+    """asyncio counterpart of ajera.Ajera
+
+    At most ``max_in_flight`` calls of this instance are on the wire at once.
+    """
+
+    def __init__(
+        self,
+        transport=None,
+        max_in_flight: int = 10,
+        renew_margin: datetime.timedelta = datetime.timedelta(minutes=5),
+        decode=None,  # "validate" (default), "json", "trusted" or a decode.Decoder
+    ):
+        self.transport = (
+            transport if transport is not None else AsyncTransport(max_in_flight)
+        )
+        self.renew_margin = renew_margin
+        self.decoder = decoder(decode)
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._session_lock = asyncio.Lock()
+        self._token = None
+        self._expiration = None
+
+    @property
+    def token(self):
+        if self._token is not None:
+            return self._token
+        else:
+            raise AjeraError("please start_session() first")
+
+    async def _create_session(self):
+        async with self._semaphore:
+            resp = await CreateSession().apost(self.transport)
+        session: CreateSessionContent = resp.content
+        self._token = session.session_token
+        self._expiration = datetime.datetime.fromisoformat(session.session_expiration)
+
+    async def _renew(self, stale_token: str):
+        async with self._session_lock:
+            if self._token == stale_token:
+                await self._create_session()
+
+    async def start_session(self):
+        """Ajera API 'CreateAPISession' function"""
+        async with self._session_lock:
+            if self._token is not None:
+                raise AjeraError("cannot start session; session already active")
+            await self._create_session()
+
+    async def close_session(self):
+        """Ajera API 'EndAPISession' function"""
+        async with self._session_lock:
+            async with self._semaphore:
+                await EndSession(session_token=self.token).apost(self.transport)
+            self._token, self._expiration = None, None
+
+    async def _post(self, request_type, decode=None, **fields):
+        """Post an AjeraCall, renewing the session if Ajera rejects the token
+        and retrying read-only calls once"""
+        decode = self.decoder if decode is None else decode
+        token = self.token
+        now = datetime.datetime.now(datetime.timezone.utc)
+        if now >= self._expiration - self.renew_margin:
+            await self._renew(token)
+            token = self.token
+        try:
+            async with self._semaphore:
+                return await request_type(session_token=token, **fields).apost(
+                    self.transport, decode
+                )
+        except AjeraSessionError:
+            await self._renew(token)
+            if not request_type.read_only:
+                # writes are sent at most once; the caller decides whether to resend
+                raise
+            async with self._semaphore:
+                return await request_type(session_token=self.token, **fields).apost(
+                    self.transport, decode
+                )
+
+    async def list_projects(
+        self,
+        by_status: list[str] = None,  # example: ["Preliminary", "Hold"],
+        by_company: list[int] = None,  # example:[1],
+        by_name_like: str = None,  # example: "Description",
+        by_description_like: str = None,  # example: "Project Description",
+        by_description_equals: str = None,  # example: "Project Description",
+        by_id_like: str = None,  # example: "20772",
+        by_project_type: list = None,  # example: [1, null],
+        by_sync_to_crm: list[bool] = None,  # example: [true],
+        by_earliest_modified_date: str = None,  # example: "2023-03-11",
+        by_latest_modified_date: str = None,  # example: "2023-03-11",
+        **kwargs
+    ):
+        """Ajera API 'ListProjects' function"""
+
+        args = ListProjectsArgs(
+            by_status=by_status,
+            by_company=by_company,
+            by_name_like=by_name_like,
+            by_description_like=by_description_like,
+            by_description_equals=by_description_equals,
+            by_id_like=by_id_like,
+            by_project_type=by_project_type,
+            by_sync_to_crm=by_sync_to_crm,
+            by_earliest_modified_date=by_earliest_modified_date,
+            by_latest_modified_date=by_latest_modified_date,
+        )
+        content: ListProjectsResponse = await self._post(
+            ListProjects, method_arguments=args, **kwargs
+        )
+
+        return content
+
+    async def get_projects(
+        self,
+        requested: list[int] = None,  # example: [1, 2, 3]
+        decode=None,
+        fields: list[str] = None,  # example: ["id", "description", "project_manager"]
+        **kwargs
+    ):
+        """Ajera API 'GetProjects' function"""
+
+        args = GetProjectsArgs(requested_projects=requested)
+        request_type = (
+            GetProjects if fields is None else projected_request(frozenset(fields))
+        )
+        content: GetProjectsResponse = await self._post(
+            request_type, decode, method_arguments=args, **kwargs
+        )
+
+        return content
+
+    async def get_projects_batched(
+        self,
+        requested: list[int],  # example: [1, 2, 3]
+        chunk_size: int = _GET_PROJECTS_LIMIT,
+        retries: int = 2,
+        **kwargs
+    ) -> GetProjectsBatchContent:
+        """Ajera API 'GetProjects' function for any number of projects
+
+        Like Ajera.get_projects_batched; the chunks run concurrently up to
+        ``max_in_flight``.
+        """
+
+        if not 0 < chunk_size <= _GET_PROJECTS_LIMIT:
+            raise AjeraError(f"chunk_size must be between 1 and {_GET_PROJECTS_LIMIT}")
+        if kwargs.get("fields") is not None:
+            projected_request(frozenset(kwargs["fields"]))  # fail once, not per chunk
+        # with interning, the chunks of this pull share one Interner
+        kwargs["decode"] = decoder(kwargs.get("decode") or self.decoder).scoped()
+
+        chunks = [
+            requested[i : i + chunk_size] for i in range(0, len(requested), chunk_size)
+        ]
+        results = await asyncio.gather(
+            *(self._get_projects_chunk(chunk, retries, **kwargs) for chunk in chunks),
+            return_exceptions=True,
+        )
+        failed = []
+        for i, result in enumerate(results):
+            if isinstance(result, _RETRYABLE):
+                failed.append(
+                    GetProjectsChunkFailure(
+                        requested_projects=chunks[i], error=repr(result)
+                    )
+                )
+                results[i] = None
+            elif isinstance(result, BaseException):
+                raise result
+
+        return _merge_chunks(results, failed)
+
+    async def _get_projects_chunk(self, chunk: list[int], retries: int, **kwargs):
+        for attempt in range(retries + 1):
+            try:
+                return await self.get_projects(requested=chunk, **kwargs)
+            except _RETRYABLE:
+                if attempt == retries:
+                    raise
+
+
+@asynccontextmanager
+async def async_ajera(transport=None, max_in_flight: int = 10):
+    ajera_inst = AsyncAjera(transport, max_in_flight)
+    await ajera_inst.start_session()
+    try:
+        yield ajera_inst
+    finally:
+        await ajera_inst.close_session()
+        if transport is None:
+            await ajera_inst.transport.aclose()
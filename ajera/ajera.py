@@ -1,48 +1,153 @@
+import contextvars
+import datetime
+import json
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 from contextlib import contextmanager
-from .errors import AjeraError
+from .dates import parse_datetime
+from .decode import decoder
+from .errors import (
+    AjeraBatchError,
+    AjeraConflictError,
+    AjeraError,
+    AjeraSessionError,
+    AjeraUpdateError,
+)
+from .governor import Governor, run_bulk
 from .model import (
-    CreateSession,
-    CreateSessionContent,
-    EndSession,
+    _GET_PROJECTS_LIMIT,
+    _LIST_PROJECTS_LIMIT,
+    _LIST_PROJECTS,
     ListProjects,
     ListProjectsResponse,
     ListProjectsArgs,
     GetProjects,
     GetProjectsResponse,
     GetProjectsArgs,
+    GetProjectsBatchContent,
+    GetProjectsChunkFailure,
+    UpdateProjects,
+    UpdateProjectsResponse,
 )
 
+from .projection import projected_request
+from .session import SessionManager, SessionPool
+from .singleflight import SingleFlight
+from .transport import Transport
+from .update import build_updates, record_id, snapshot
+
+# failures worth another attempt: API errors, network errors (requests raises
+# OSError subclasses) and truncated responses; orjson's error subclasses
+# JSONDecodeError. Invalid arguments and validation errors are not retried.
+_RETRYABLE = (AjeraError, OSError, json.JSONDecodeError)
+# lower bound of the modified date windows enumerated by list_projects_sharded
+_EARLIEST = datetime.date(1900, 1, 1)
+
 
 class Ajera:
     """AJERA API interaction class"""
 
-    _token = None
+    def __init__(
+        self,
+        transport=None,
+        token_file=None,
+        renew_margin: datetime.timedelta = datetime.timedelta(minutes=5),
+        decode=None,  # "validate" (default), "json", "trusted" or a decode.Decoder
+        cache=None,  # a cache.ResponseCache shared by list_projects/get_projects
+        coalesce: bool = False,  # share identical concurrent calls, see _post
+        pool: SessionPool = None,  # spread calls over the sessions of a pool
+        governor: Governor = None,  # adaptive concurrency and call budget
+    ):
+        # one keep-alive connection pool shared by every call of this instance
+        self.transport = transport if transport is not None else Transport()
+        self.session = SessionManager(self.transport, token_file, renew_margin)
+        self.pool = pool
+        self.governor = governor
+        if pool is not None and pool.transport is None:
+            pool.transport = self.transport
+        self.decoder = decoder(decode)
+        self.cache = cache
+        self._flights = SingleFlight() if coalesce else None
+        # record_id -> snapshot of records fetched with get_projects(track=True)
+        self._snapshots = {}
+        self._snapshots_lock = threading.Lock()
 
     @property
     def token(self):
-        if self._token is not None:
-            return self._token
-        else:
-            raise AjeraError("please create_session() first")
+        if self.pool is not None:
+            raise AjeraError("pooled sessions have no single token")
+        return self.session.token()
 
     @token.setter
     def token(self, t):
-        if self._token is None:
-            self._token = t
-        else:
-            raise AjeraError("please close_session() first")
+        self.session.adopt(t)
 
     def start_session(self):
-        """Ajera API 'CreateAPISession' function"""
-        session: CreateSessionContent = CreateSession().post().content
-        if self._token is None:
-            self._token = session.session_token
+        """Ajera API 'CreateAPISession' function
+
+        With a ``token_file`` a still valid session saved by another process is
+        reused instead. With a ``pool`` all of its sessions are started.
+        """
+        if self.pool is not None:
+            self.pool.start()
+        else:
+            self.session.start()
+
+    def close_session(self, end: bool = None):
+        """Ajera API 'EndAPISession' function
+
+        A session shared through a ``token_file`` is kept open unless ``end``.
+        With a ``pool`` all of its sessions are ended.
+        """
+        if self.pool is not None:
+            self.pool.close()
         else:
-            raise AjeraError("cannot start session; session already active")
+            self.session.close(end)
 
-    def close_session(self):
-        EndSession(session_token=self._token).post()
-        del self._token
+    def _post(self, request_type, decode=None, coalesce=True, **fields):
+        """Post an AjeraCall, renewing the session if Ajera rejects the token
+        and retrying read-only calls once
+
+        With ``coalesce`` on the instance, concurrent identical
+        ListProjects/GetProjects calls (from other threads) share one API call;
+        each caller but the first gets a deep copy of its decoded response.
+        ``coalesce=False`` sends this call on its own.
+        """
+        decode = self.decoder if decode is None else decode
+        if self._flights is None or not coalesce or not request_type.read_only:
+            return self._send(request_type, decode, fields)
+        # identical calls but for the session token are one flight
+        payload = request_type(session_token="", **fields).model_dump_json(
+            by_alias=True, exclude_none=True, exclude={"session_token"}
+        )
+        return self._flights.do(
+            (request_type, decode, payload),
+            lambda: self._send(request_type, decode, fields),
+            lambda response: response.model_copy(deep=True),
+        )
+
+    def _send(self, request_type, decode, fields: dict):
+        if self.pool is None:
+            return self._send_with(self.session, request_type, decode, fields)
+        with self.pool.session() as session:
+            return self._send_with(session, request_type, decode, fields)
+
+    def _send_with(self, session, request_type, decode, fields: dict):
+        transport = self.transport
+        if self.governor is not None:
+            # only the API call holds a slot, not pool waits or re-logins
+            transport = self.governor.wrap(transport)
+        token = session.token()
+        try:
+            return request_type(session_token=token, **fields).post(transport, decode)
+        except AjeraSessionError:
+            session.renew(stale_token=token)
+            if not request_type.read_only:
+                # writes are sent at most once; the caller decides whether to resend
+                raise
+            return request_type(session_token=session.token(), **fields).post(
+                transport, decode
+            )
 
     def list_projects(
         self,
@@ -56,6 +161,7 @@ class Ajera:
         by_sync_to_crm: list[bool] = None,  # example: [true],
         by_earliest_modified_date: str = None,  # example: "2023-03-11",
         by_latest_modified_date: str = None,  # example: "2023-03-11",
+        use_cache: bool = True,
         **kwargs
     ):
         """Ajera API 'ListProjects' function"""
@@ -72,28 +178,319 @@ class Ajera:
             by_earliest_modified_date=by_earliest_modified_date,
             by_latest_modified_date=by_latest_modified_date,
         )
-        lp_model = ListProjects(
-            session_token=self._token, method_arguments=args, **kwargs
+        cached = self.cache is not None and use_cache and not kwargs
+        if cached:
+            key = self.cache.list_key(args)
+            body = self.cache.get(key)
+            if body is not None:
+                request = ListProjects.model_construct(method_arguments=args)
+                return request.decode(body, self.decoder)
+        content: ListProjectsResponse = self._post(
+            ListProjects, method_arguments=args, **kwargs
         )
-        content: ListProjectsResponse = lp_model.post()
+        if cached:
+            self.cache.put(
+                key, content.model_dump_json(by_alias=True).encode(), _LIST_PROJECTS
+            )
 
         return content
 
-    def get_projects(self, requested: list[int] = None, **kwargs):  # example: [1, 2, 3]
-        """Ajera API 'GetProjects' function"""
+    def list_projects_sharded(
+        self,
+        by_status: list[str] = None,  # example: ["Active", "Inactive", "Hold"],
+        by_company: list[int] = None,  # example:[1, 2],
+        since: datetime.date = datetime.date(2000, 1, 1),
+        window: datetime.timedelta = datetime.timedelta(days=365),
+        max_workers: int = 4,
+        cap: int = _LIST_PROJECTS_LIMIT,
+        use_cache: bool = True,
+        **kwargs
+    ) -> list:
+        """Every project matching the filters, from ListProjects calls over
+        partitions of the projects, run concurrently
+
+        The partitions are LastModifiedDate windows of ``window`` from ``since``
+        to today (plus one window for anything older), times each status in
+        ``by_status`` and each company in ``by_company``. A window that returns
+        ``cap`` rows (the API's row limit) may have been cut short, so it is
+        split in two (both date filters include their day) and listed again.
+        Windows share their boundary days, and the ProjectInfo records are
+        de-duplicated by key (in key order).
+        Other ListProjects filters are passed on as ``kwargs``.
+        """
+
+        end = datetime.date.today() + datetime.timedelta(days=1)
+        bounds = [_EARLIEST, since]
+        while bounds[-1] < end:
+            bounds.append(min(bounds[-1] + window, end))
+        partitions = [
+            (earliest, latest, status, company)
+            for earliest, latest in zip(bounds, bounds[1:])
+            for status in (by_status or [None])
+            for company in (by_company or [None])
+        ]
+
+        projects = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+
+            def submit(partition):
+                earliest, latest, status, company = partition
+                return executor.submit(
+                    run_bulk,
+                    self.list_projects,
+                    by_status=None if status is None else [status],
+                    by_company=None if company is None else [company],
+                    by_earliest_modified_date=earliest.isoformat(),
+                    by_latest_modified_date=latest.isoformat(),
+                    use_cache=use_cache,
+                    **kwargs,
+                )
+
+            pending = {submit(p): p for p in partitions}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    earliest, latest, status, company = pending.pop(future)
+                    listed = future.result().content.projects
+                    if len(listed) >= cap:
+                        if earliest == latest:
+                            raise AjeraError(
+                                f"{cap}+ projects modified on {earliest} (status "
+                                f"{status}, company {company}); partition further "
+                                "by status or company"
+                            )
+                        middle = earliest + (latest - earliest) // 2
+                        one_day = datetime.timedelta(days=1)
+                        for half in ((earliest, middle), (middle + one_day, latest)):
+                            partition = (*half, status, company)
+                            pending[submit(partition)] = partition
+                        continue
+                    for project in listed:
+                        projects[project.key] = project
+
+        return [projects[key] for key in sorted(projects)]
+
+    def get_projects(
+        self,
+        requested: list[int] = None,  # example: [1, 2, 3]
+        track: bool = False,
+        decode=None,
+        fields: list[str] = None,  # example: ["id", "description", "project_manager"]
+        use_cache: bool = True,
+        **kwargs
+    ):
+        """Ajera API 'GetProjects' function
+
+        With ``track`` the fetched projects and phases are remembered as the
+        baseline that ``update_projects`` diffs edited records against.
+        ``decode`` overrides the instance's decode mode for this call.
+        With ``fields`` the records only hold those fields (and their keys);
+        everything else in the response is dropped while decoding.
+        With a cache, only projects missing from it are requested; tracked
+        (to be edited) records are always fetched fresh.
+        """
 
         args = GetProjectsArgs(requested_projects=requested)
-        gp_model = GetProjects(
-            session_token=self._token, method_arguments=args, **kwargs
+        request_type = (
+            GetProjects if fields is None else projected_request(frozenset(fields))
         )
-        content: GetProjectsResponse = gp_model.post()  # .content
+        if self.cache is not None and use_cache and not track and not kwargs:
+            content = self._get_projects_cached(request_type, args, decode, fields)
+        else:
+            # tracked records are edited; never share them with another caller
+            content: GetProjectsResponse = self._post(
+                request_type,
+                decode,
+                coalesce=not track,
+                method_arguments=args,
+                **kwargs,
+            )
+            if self.cache is not None and not kwargs:
+                self.cache.put_projects(content.content, fields)
+        if track:
+            tracked = {
+                record_id(record): snapshot(record)
+                for record in (*content.content.projects, *content.content.phases)
+            }
+            with self._snapshots_lock:
+                self._snapshots.update(tracked)
 
         return content
 
+    def _get_projects_cached(self, request_type, args, decode, fields):
+        requested = args.requested_projects
+        hits, missing = self.cache.get_projects(requested, fields)
+        if missing:
+            fetched: GetProjectsResponse = self._post(
+                request_type,
+                decode,
+                method_arguments=GetProjectsArgs(requested_projects=missing),
+            )
+            if not hits:
+                self.cache.put_projects(fetched.content, fields)
+                return fetched
+            hits.update(self.cache.put_projects(fetched.content, fields))
+        body = self.cache.assemble(hits[k] for k in requested if k in hits)
+        request = request_type.model_construct(method_arguments=args)
+        return request.decode(body, self.decoder if decode is None else decode)
+
+    def get_projects_batched(
+        self,
+        requested: list[int],  # example: [1, 2, 3]
+        chunk_size: int = _GET_PROJECTS_LIMIT,
+        max_workers: int = 4,
+        retries: int = 2,
+        **kwargs
+    ):
+        """Ajera API 'GetProjects' function for any number of projects
+
+        The keys are split into chunks of at most ``chunk_size`` (the API limit)
+        which are fetched concurrently. Each chunk is retried ``retries`` times;
+        chunks that still fail are reported in ``failed`` on the merged content
+        instead of aborting the whole pull.
+        """
+
+        if not 0 < chunk_size <= _GET_PROJECTS_LIMIT:
+            raise AjeraError(f"chunk_size must be between 1 and {_GET_PROJECTS_LIMIT}")
+        if kwargs.get("fields") is not None:
+            projected_request(frozenset(kwargs["fields"]))  # fail once, not per chunk
+        # with interning, the chunks of this pull share one Interner
+        kwargs["decode"] = decoder(kwargs.get("decode") or self.decoder).scoped()
+
+        chunks = [
+            requested[i : i + chunk_size] for i in range(0, len(requested), chunk_size)
+        ]
+        results = [None] * len(chunks)
+        failed = []
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                # in the caller's context, so the chunks keep its priority
+                executor.submit(
+                    contextvars.copy_context().run,
+                    self._get_projects_chunk,
+                    chunk,
+                    retries,
+                    **kwargs,
+                ): i
+                for i, chunk in enumerate(chunks)
+            }
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    results[i] = future.result()
+                except _RETRYABLE as e:
+                    failed.append(
+                        GetProjectsChunkFailure(requested_projects=chunks[i], error=repr(e))
+                    )
+
+        return _merge_chunks(results, failed)
+
+    def _get_projects_chunk(self, chunk: list[int], retries: int, **kwargs):
+        for attempt in range(retries + 1):
+            try:
+                return self.get_projects(requested=chunk, **kwargs)
+            except _RETRYABLE:
+                if attempt == retries:
+                    raise
+
+    def update_projects(
+        self,
+        records: list,  # edited ProjectData and Phase records
+        originals: list = None,
+        check_conflicts: bool = True,
+        **kwargs
+    ) -> list[UpdateProjectsResponse]:
+        """Ajera API 'UpdateProjects' function, sending only the changed fields
+
+        Edited records are diffed against ``originals`` or, by default, the
+        state tracked by ``get_projects(track=True)``. With ``check_conflicts``
+        the records' current LastModifiedDate is fetched first, and
+        AjeraConflictError is raised, before anything is sent, if any of them
+        changed since they were fetched.
+        """
+
+        if originals is None:
+            with self._snapshots_lock:
+                snapshots = dict(self._snapshots)
+        else:
+            snapshots = {record_id(o): snapshot(o) for o in originals}
+        batches = build_updates(records, snapshots)
+        sent = [
+            (section, entry[key])
+            for args in batches
+            for section, key in (("projects", "ProjectKey"), ("phases", "PhaseKey"))
+            for entry in getattr(args, section)
+        ]
+
+        if check_conflicts and sent:
+            edited = {record_id(r): r for r in records}
+            project_keys = list(dict.fromkeys(edited[rid].project_key for rid in sent))
+            current = self.get_projects_batched(project_keys, use_cache=False)
+            if current.failed:
+                raise AjeraBatchError(current)
+            modified = {
+                record_id(r): r.last_modified_date
+                for r in (*current.projects, *current.phases)
+            }
+            conflicts = [
+                edited[rid]
+                for rid in sent
+                if modified.get(rid)
+                != parse_datetime(snapshots[rid]["LastModifiedDate"])
+            ]
+            if conflicts:
+                raise AjeraConflictError(conflicts)
+
+        responses = []
+        for i, args in enumerate(batches):
+            try:
+                responses.append(
+                    self._post(UpdateProjects, method_arguments=args, **kwargs)
+                )
+            except Exception as e:
+                raise AjeraUpdateError(responses, batches[i:], e) from e
+            # the tracked state is stale now; re-fetch before editing these again
+            self._forget_updates([args])
+
+        return responses
+
+    def _forget_updates(self, batches):
+        # drop tracked snapshots and cached copies of records that were sent
+        keys = [
+            (section, entry[key])
+            for args in batches
+            for section, key in (("projects", "ProjectKey"), ("phases", "PhaseKey"))
+            for entry in getattr(args, section)
+        ]
+        with self._snapshots_lock:
+            for rid in keys:
+                self._snapshots.pop(rid, None)
+        if self.cache is not None:
+            self.cache.invalidate_projects(
+                {
+                    e["ProjectKey"]
+                    for args in batches
+                    for e in args.projects + args.phases
+                }
+            )
+            self.cache.invalidate_lists()
+
+
+def _merge_chunks(results, failed) -> GetProjectsBatchContent:
+    # results are in requested order regardless of completion order
+    contents = [r.content for r in results if r is not None]
+    return GetProjectsBatchContent.model_construct(
+        projects=[p for c in contents for p in c.projects],
+        phases=[p for c in contents for p in c.phases],
+        invoice_groups=[g for c in contents for g in c.invoice_groups],
+        failed=failed,
+    )
+
 
 @contextmanager
-def ajera():
-    ajera_inst = Ajera()
+def ajera(transport=None, token_file=None, decode=None):
+    ajera_inst = Ajera(transport, token_file, decode=decode)
     ajera_inst.start_session()
     try:
         yield ajera_inst
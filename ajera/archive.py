@@ -0,0 +1,244 @@
+import datetime
+import json
+import mmap
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from .errors import AjeraError
+from .model import _CREATE_API_SESSION, _END_API_SESSION
+
+_LOG = "responses.zlog"
+_INDEX = "index.db"
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS calls (
+    id INTEGER PRIMARY KEY,
+    method TEXT NOT NULL,
+    arguments TEXT NOT NULL,
+    recorded REAL NOT NULL,
+    offset INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    body_size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS calls_lookup ON calls (method, arguments, recorded);
+CREATE INDEX IF NOT EXISTS calls_recorded ON calls (recorded);
+"""
+# never archived: their payloads hold credentials and their answers expire
+_SESSION_METHODS = (_CREATE_API_SESSION, _END_API_SESSION)
+
+
+def _arguments(payload: dict) -> str:
+    return json.dumps(
+        payload.get("MethodArguments") or {}, sort_keys=True, separators=(",", ":")
+    )
+
+
+class Archive:
+    """Append-only archive of raw API responses in directory ``path``
+
+    Response bodies are zlib compressed frames appended to one log file; a
+    SQLite index maps (method, arguments, recorded time) to each frame. Session
+    calls are not archived, and neither are session tokens.
+    """
+
+    def __init__(self, path: str | os.PathLike, level: int = 6):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.level = level
+        self._lock = threading.Lock()
+        self._log = open(os.path.join(path, _LOG), "ab")
+        self._db = sqlite3.connect(os.path.join(path, _INDEX), check_same_thread=False)
+        with self._db:
+            self._db.executescript(_SCHEMA)
+        self._map = None
+
+    def close(self):
+        with self._lock:
+            self._log.close()
+            self._db.close()
+            if self._map is not None:
+                self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def append(self, payload: dict, body: bytes, recorded: float = None) -> int:
+        """Archive the response ``body`` to ``payload``; returns its id"""
+        frame = zlib.compress(body, self.level)
+        with self._lock:
+            offset = self._log.seek(0, os.SEEK_END)
+            self._log.write(frame)
+            self._log.flush()  # the frame is complete before it is indexed
+            with self._db:
+                cursor = self._db.execute(
+                    "INSERT INTO calls (method, arguments, recorded, offset, size,"
+                    " body_size) VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        payload["Method"],
+                        _arguments(payload),
+                        time.time() if recorded is None else recorded,
+                        offset,
+                        len(frame),
+                        len(body),
+                    ),
+                )
+        return cursor.lastrowid
+
+    def entries(
+        self,
+        method: str = None,
+        since: datetime.datetime = None,
+        until: datetime.datetime = None,
+    ) -> list[dict]:
+        """Index rows (id, method, arguments, recorded, body_size), oldest first"""
+        clauses, params = [], []
+        if method is not None:
+            clauses.append("method = ?")
+            params.append(method)
+        if since is not None:
+            clauses.append("recorded >= ?")
+            params.append(since.timestamp())
+        if until is not None:
+            clauses.append("recorded <= ?")
+            params.append(until.timestamp())
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, method, arguments, recorded, body_size FROM calls"
+                f"{where} ORDER BY recorded, id",
+                params,
+            ).fetchall()
+        return [
+            {
+                "id": id_,
+                "method": method_,
+                "arguments": json.loads(arguments),
+                "recorded": datetime.datetime.fromtimestamp(recorded).astimezone(),
+                "body_size": body_size,
+            }
+            for id_, method_, arguments, recorded, body_size in rows
+        ]
+
+    def find(self, payload: dict, as_of: datetime.datetime = None) -> int | None:
+        """Id of the latest archived response to ``payload`` (recorded no later
+        than ``as_of``)"""
+        as_of = float("inf") if as_of is None else as_of.timestamp()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id FROM calls WHERE method = ? AND arguments = ?"
+                " AND recorded <= ? ORDER BY recorded DESC, id DESC LIMIT 1",
+                (payload["Method"], _arguments(payload), as_of),
+            ).fetchone()
+        return None if row is None else row[0]
+
+    def body(self, id_: int, use_mmap: bool = False) -> bytes:
+        """The archived response body ``id_``"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT offset, size FROM calls WHERE id = ?", (id_,)
+            ).fetchone()
+            if row is None:
+                raise AjeraError(f"no archived response {id_}")
+            offset, size = row
+            if use_mmap:
+                if self._map is None or len(self._map) < offset + size:
+                    if self._map is not None:
+                        self._map.close()
+                    with open(os.path.join(self.path, _LOG), "rb") as f:
+                        self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                frame = self._map[offset : offset + size]
+        if not use_mmap:
+            with open(os.path.join(self.path, _LOG), "rb") as f:
+                f.seek(offset)
+                frame = f.read(size)
+        return zlib.decompress(frame)
+
+
+class RecordingTransport:
+    """Transport wrapper archiving every API response it passes through"""
+
+    def __init__(self, transport, archive: Archive):
+        self.transport = transport
+        self.archive = archive
+
+    def post(self, url: str, json: dict) -> bytes:
+        body = self.transport.post(url=url, json=json)
+        if json["Method"] not in _SESSION_METHODS:
+            self.archive.append(json, body)
+        return body
+
+    def close(self):
+        self.transport.close()
+
+
+class ReplayTransport:
+    """Transport answering API calls from an Archive instead of the network
+
+    Each call gets the latest response archived for the same method and
+    arguments (recorded no later than ``as_of``). Calls that were never
+    archived go to ``fallback`` (a transport) or raise AjeraError. Session
+    calls go to ``fallback`` too, so its calls carry a real token; without one
+    they are answered locally. ``use_mmap`` reads the log through a memory map.
+    """
+
+    def __init__(
+        self,
+        archive: Archive,
+        as_of: datetime.datetime = None,
+        use_mmap: bool = True,
+        fallback=None,
+    ):
+        self.archive = archive
+        self.as_of = as_of
+        self.use_mmap = use_mmap
+        self.fallback = fallback
+
+    def post(self, url: str, json: dict) -> bytes:
+        method = json["Method"]
+        if method in _SESSION_METHODS:
+            if self.fallback is not None:
+                return self.fallback.post(url=url, json=json)
+            return _session_response(method)
+        id_ = self.archive.find(json, self.as_of)
+        if id_ is not None:
+            return self.archive.body(id_, self.use_mmap)
+        if self.fallback is not None:
+            return self.fallback.post(url=url, json=json)
+        raise AjeraError(f"no archived {method} response for {_arguments(json)}")
+
+    def close(self):
+        if self.fallback is not None:
+            self.fallback.close()
+
+
+def _session_response(method: str) -> bytes:
+    content = {}
+    if method == _CREATE_API_SESSION:
+        expiration = datetime.datetime.now().astimezone() + datetime.timedelta(days=1)
+        content = {
+            "CompanyName": "",
+            "UsingICRMobile": False,
+            "SessionToken": "replay",
+            "SessionExpiration": expiration.isoformat(),
+            "APIURL": "",
+            "AjeraVersion": "",
+            "ICRConfigFile": {
+                "icrURL": "",
+                "icrClientId": "",
+                "icrUserName": "",
+                "icrApiKey": "",
+            },
+        }
+    return json.dumps(
+        {
+            "ResponseCode": 200,
+            "Message": "Success",
+            "Errors": [],
+            "Content": content,
+            "UsageKey": "",
+        }
+    ).encode()
@@ -1,7 +1,15 @@
 import os
 
 
-# Ajera API login info
-_PW = os.environ["AJERA_PW"]
-_USER = os.environ["AJERA_USER"]
-_API = os.environ["AJERA_API"]
+# Ajera API login info, read from the environment when first needed so that
+# importing the package neither requires credentials nor logs in
+def _api() -> str:
+    return os.environ["AJERA_API"]
+
+
+def _user() -> str:
+    return os.environ["AJERA_USER"]
+
+
+def _pw() -> str:
+    return os.environ["AJERA_PW"]
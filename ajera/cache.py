@@ -0,0 +1,240 @@
+import collections
+import datetime
+import sqlite3
+import threading
+import time
+from .model import _GET_PROJECTS, _LIST_PROJECTS, GetProjectsContent, ListProjectsArgs
+
+_DEFAULT_TTL = {_LIST_PROJECTS: 300.0, _GET_PROJECTS: 3600.0}  # seconds
+_PRUNE_EVERY = 1000  # disk puts between expiry/size sweeps
+
+# only raw JSON is stored: a ListProjects body in ``value``, or a project's
+# record in ``value`` with its phases and invoice groups in ``phases``/``groups``
+_DISK_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    project_key INTEGER,
+    expires REAL NOT NULL,
+    size INTEGER NOT NULL,
+    value BLOB NOT NULL,
+    phases BLOB,
+    groups BLOB
+);
+CREATE INDEX IF NOT EXISTS responses_project ON responses (project_key);
+CREATE INDEX IF NOT EXISTS responses_expires ON responses (expires);
+"""
+
+
+def _dumps(record) -> bytes:
+    return record.model_dump_json(by_alias=True, warnings=False).encode()
+
+
+def _size(value) -> int:
+    return len(value) if isinstance(value, bytes) else sum(len(v) for v in value)
+
+
+class ResponseCache:
+    """Two-tier cache of ListProjects and GetProjects responses
+
+    ListProjects responses are cached whole, keyed on their arguments.
+    GetProjects records are cached per ProjectKey (and field projection), so a
+    request only fetches the projects that are missing or expired. Entries hold
+    wire JSON: hits are decoded into fresh models that callers may edit.
+
+    The memory tier is an LRU bounded by ``max_bytes``; with a ``path`` entries
+    are also written to a SQLite file bounded by ``max_disk_bytes`` that
+    outlives the process. ``ttl`` maps method names to seconds.
+    """
+
+    def __init__(
+        self,
+        ttl: dict[str, float] = None,
+        max_bytes: int = 256 * 2**20,
+        path: str = None,
+        max_disk_bytes: int = 2 * 2**30,
+    ):
+        self.ttl = {**_DEFAULT_TTL, **(ttl or {})}
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.checked = None  # date of the last revalidate()
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()  # key -> (expires, value)
+        self._bytes = 0
+        self._db = None
+        self._puts = 0
+        if path is not None:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            with self._db:
+                self._db.executescript(_DISK_SCHEMA)
+
+    @staticmethod
+    def list_key(args: ListProjectsArgs) -> str:
+        return (
+            f"{_LIST_PROJECTS}:{args.model_dump_json(by_alias=True, exclude_none=True)}"
+        )
+
+    @staticmethod
+    def project_key(project_key: int, fields=None) -> str:
+        projection = ",".join(sorted(fields)) if fields else "*"
+        return f"{_GET_PROJECTS}:{projection}:{project_key}"
+
+    def get(self, key: str):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    return entry[1]
+                self._drop(key)
+            if self._db is None:
+                return None
+            row = self._db.execute(
+                "SELECT expires, value, phases, groups FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None or row[0] <= now:
+                return None
+            value = bytes(row[1]) if row[2] is None else tuple(map(bytes, row[1:]))
+            self._remember(key, row[0], value)
+            return value
+
+    def put(self, key: str, value, method: str, project_key: int = None):
+        expires = time.time() + self.ttl[method]
+        with self._lock:
+            self._remember(key, expires, value)
+            if self._db is not None:
+                with self._db:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (key, project_key, expires, _size(value))
+                        + ((value, None, None) if isinstance(value, bytes) else value),
+                    )
+                self._puts += 1
+                if self._puts % _PRUNE_EVERY == 0:
+                    self._prune_disk()
+
+    def get_projects(self, requested: list[int], fields=None):
+        """(cached entries by ProjectKey, keys still to fetch)"""
+        hits, missing = {}, []
+        for k in requested:
+            entry = self.get(self.project_key(k, fields))
+            if entry is None:
+                missing.append(k)
+            else:
+                hits[k] = entry
+        return hits, missing
+
+    def put_projects(self, content: GetProjectsContent, fields=None) -> dict:
+        """Cache each project of ``content`` with its phases and invoice groups"""
+        phases, groups = collections.defaultdict(list), collections.defaultdict(list)
+        for p in content.phases:
+            phases[p.project_key].append(_dumps(p))
+        for g in content.invoice_groups:
+            groups[g.project_key].append(_dumps(g))
+        entries = {}
+        for p in content.projects:
+            k = p.project_key
+            entries[k] = (_dumps(p), b",".join(phases[k]), b",".join(groups[k]))
+            self.put(self.project_key(k, fields), entries[k], _GET_PROJECTS, k)
+        return entries
+
+    @staticmethod
+    def assemble(entries) -> bytes:
+        """A GetProjects response body made of cached project entries"""
+        entries = list(entries)
+        projects = b",".join(e[0] for e in entries)
+        phases = b",".join(e[1] for e in entries if e[1])
+        groups = b",".join(e[2] for e in entries if e[2])
+        return (
+            b'{"ResponseCode":200,"Message":"Success","Errors":[],"UsageKey":"",'
+            b'"Content":{"Projects":[%s],"Phases":[%s],"InvoiceGroups":[%s]}}'
+            % (projects, phases, groups)
+        )
+
+    def invalidate_projects(self, project_keys):
+        """Drop the cached records (all projections) of ``project_keys``"""
+        suffixes = {f":{k}" for k in project_keys}
+        with self._lock:
+            for key in [
+                key
+                for key in self._entries
+                if key.startswith(_GET_PROJECTS) and key[key.rindex(":") :] in suffixes
+            ]:
+                self._drop(key)
+            if self._db is not None:
+                with self._db:
+                    self._db.executemany(
+                        "DELETE FROM responses WHERE project_key = ?",
+                        ((k,) for k in project_keys),
+                    )
+
+    def invalidate_lists(self):
+        """Drop every cached ListProjects response"""
+        with self._lock:
+            for key in [k for k in self._entries if k.startswith(_LIST_PROJECTS)]:
+                self._drop(key)
+            if self._db is not None:
+                with self._db:
+                    self._db.execute(
+                        "DELETE FROM responses WHERE key LIKE ?",
+                        (f"{_LIST_PROJECTS}:%",),
+                    )
+
+    def revalidate(self, ajera):
+        """Drop entries of projects whose LastModifiedDate moved since the last
+        revalidate (or, the first time, since today)
+
+        One ListProjects call filtered by modified date; returns the keys of
+        the modified projects.
+        """
+        today = datetime.date.today().isoformat()
+        listed = ajera.list_projects(
+            by_earliest_modified_date=self.checked or today, use_cache=False
+        )
+        modified = [p.key for p in listed.content.projects]
+        if modified:
+            self.invalidate_projects(modified)
+            self.invalidate_lists()
+        self.checked = today
+        return modified
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            if self._db is not None:
+                with self._db:
+                    self._db.execute("DELETE FROM responses")
+
+    def _remember(self, key, expires, value):
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = (expires, value)
+        self._bytes += _size(value)
+        while self._bytes > self.max_bytes and self._entries:
+            self._drop(next(iter(self._entries)))
+
+    def _drop(self, key):
+        _, value = self._entries.pop(key)
+        self._bytes -= _size(value)
+
+    def _prune_disk(self):
+        with self._db:
+            self._db.execute("DELETE FROM responses WHERE expires <= ?", (time.time(),))
+            (total,) = self._db.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            if total > self.max_disk_bytes:
+                # evict the entries closest to expiring until under the bound
+                excess = total - self.max_disk_bytes
+                rows = self._db.execute(
+                    "SELECT key, size FROM responses ORDER BY expires"
+                )
+                doomed = []
+                for key, size in rows:
+                    if excess <= 0:
+                        break
+                    doomed.append((key,))
+                    excess -= size
+                self._db.executemany("DELETE FROM responses WHERE key = ?", doomed)
@@ -0,0 +1,88 @@
+import os
+from .model import GetProjectsContent
+
+_TABLES = ("projects", "phases", "invoice_groups")
+_EXTENSIONS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("columnar snapshots require pyarrow") from e
+    return pyarrow
+
+
+def flatten(data: dict, prefix: str = "") -> dict:
+    """Nested dicts become prefixed columns, e.g. project_manager_key"""
+    flat = {}
+    for name, value in data.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{name}_"))
+        else:
+            flat[f"{prefix}{name}"] = value
+    return flat
+
+
+def to_table(records):
+    """One row per record, with employees and custom fields flattened
+
+    Columns are the union over all records (extras included); missing values
+    are null.
+    """
+    pa = _pyarrow()
+    rows = [flatten(r.model_dump(warnings=False)) for r in records]
+    names = list(dict.fromkeys(name for row in rows for name in row))
+    return pa.table({name: [row.get(name) for row in rows] for name in names})
+
+
+def to_tables(content: GetProjectsContent) -> dict:
+    """projects, phases and invoice_groups tables of ``content``"""
+    return {name: to_table(getattr(content, name)) for name in _TABLES}
+
+
+def write_snapshot(
+    content: GetProjectsContent, directory: str, format: str = "parquet"
+) -> dict[str, str]:
+    """Write ``content`` as one file per table into ``directory``
+
+    ``format`` is "parquet" (compressed, smallest) or "arrow" (uncompressed
+    Arrow IPC, which read_snapshot memory-maps without copying).
+    """
+    pa = _pyarrow()
+    if format not in _EXTENSIONS:
+        raise ValueError(f"format must be one of {', '.join(_EXTENSIONS)}")
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+    for name, table in to_tables(content).items():
+        path = os.path.join(directory, name + _EXTENSIONS[format])
+        if format == "parquet":
+            pa.parquet.write_table(table, path)
+        else:
+            with pa.OSFile(path, "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+        paths[name] = path
+    return paths
+
+
+def read_snapshot(directory: str, memory_map: bool = True) -> dict:
+    """Tables written by write_snapshot, by name, in whichever format exists"""
+    pa = _pyarrow()
+    tables = {}
+    for name in _TABLES:
+        path = os.path.join(directory, name)
+        if os.path.exists(path + ".arrow"):
+            source = (
+                pa.memory_map(path + ".arrow")
+                if memory_map
+                else pa.OSFile(path + ".arrow")
+            )
+            tables[name] = pa.ipc.open_file(source).read_all()
+        elif os.path.exists(path + ".parquet"):
+            tables[name] = pa.parquet.read_table(
+                path + ".parquet", memory_map=memory_map
+            )
+    return tables
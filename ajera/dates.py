@@ -0,0 +1,63 @@
+import datetime
+from pydantic_core import core_schema
+
+
+class AjeraDateTime(datetime.datetime):
+    """Aware datetime that keeps Ajera's time zone label for the round trip
+
+    Ajera writes LastModifiedDate as
+    "2023-09-27 09:57:49.607 GMT-04:00 (Eastern Daylight Time)"; the label is
+    kept so that JSON serialisation gives back exactly that string.
+    """
+
+    __slots__ = ("label",)
+
+    def __reduce_ex__(self, protocol):
+        cls, args = super().__reduce_ex__(protocol)[:2]
+        return cls, args, (None, {"label": getattr(self, "label", None)})
+
+    def wire(self) -> str:
+        """The Ajera wire format of this timestamp"""
+        stamp = self.isoformat(sep=" ", timespec="milliseconds")
+        if self.tzinfo is None:
+            return stamp
+        label = getattr(self, "label", None)
+        value = f"{stamp[:-6]} GMT{stamp[-6:]}"
+        return f"{value} ({label})" if label else value
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source, handler):
+        return core_schema.no_info_plain_validator_function(
+            _validate,
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                AjeraDateTime.wire, when_used="json"
+            ),
+        )
+
+
+def parse_datetime(value: str) -> AjeraDateTime:
+    """Parse Ajera's LastModifiedDate format into an aware datetime
+
+    example: "2023-09-27 09:57:49.607 GMT-04:00 (Eastern Daylight Time)"
+    ISO 8601 strings are accepted too.
+    """
+    stamp, _, zone = value.partition(" GMT")
+    offset, _, label = zone.partition(" (")
+    parsed = AjeraDateTime.fromisoformat(stamp + offset)
+    parsed.label = label[:-1] or None
+    return parsed
+
+
+def _validate(value) -> AjeraDateTime:
+    if isinstance(value, AjeraDateTime):
+        return value
+    if isinstance(value, str):
+        try:
+            return parse_datetime(value)
+        except ValueError:
+            raise ValueError(f"invalid Ajera timestamp: {value!r}") from None
+    if isinstance(value, datetime.datetime):
+        parsed = AjeraDateTime.combine(value.date(), value.timetz())
+        parsed.label = None
+        return parsed
+    raise ValueError(f"invalid Ajera timestamp: {value!r}")
@@ -0,0 +1,375 @@
+import copy
+import datetime
+import functools
+import gc
+import json
+import re
+import threading
+import time
+import types
+import typing
+from sys import intern
+from contextlib import contextmanager
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from .dates import AjeraDateTime, parse_datetime
+from .errors import AjeraError, AjeraSessionError
+
+try:
+    import orjson
+except ImportError:  # optional, only speeds up trusted decoding
+    orjson = None
+
+
+_MODES = ("validate", "json", "trusted", "interned")
+
+
+def loads(body: bytes):
+    return orjson.loads(body) if orjson is not None else json.loads(body)
+
+
+# trusted decoding turns these JSON strings into their field types directly
+_CONVERTERS = {
+    AjeraDateTime: parse_datetime,
+    datetime.date: datetime.date.fromisoformat,
+}
+
+
+def _converter(annotation):
+    origin = typing.get_origin(annotation)
+    if origin is tuple:  # tuples arrive as JSON arrays
+        return tuple
+    if origin in (typing.Union, types.UnionType):
+        for arg in typing.get_args(annotation):
+            if arg in _CONVERTERS:
+                return _CONVERTERS[arg]
+    return _CONVERTERS.get(annotation)
+
+
+@functools.cache
+def _plan(model: type[BaseModel]) -> dict:
+    """alias (and name) -> (name, nested model, many, converter, annotation)
+    per field
+
+    many is set for lists of models; converter (e.g. tuple, parse_datetime)
+    builds the field's type from its JSON value.
+    """
+    plan = {}
+    for name, field in model.model_fields.items():
+        annotation = field.annotation
+        nested, many = None, False
+        if typing.get_origin(annotation) is list:
+            (item,) = typing.get_args(annotation) or (None,)
+            if isinstance(item, type) and issubclass(item, BaseModel):
+                nested, many = item, True
+        elif isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            nested = annotation
+        convert = _converter(annotation)
+        spec = (name, nested, many, convert, annotation)
+        plan[name] = plan[field.alias or name] = spec
+    return plan
+
+
+@functools.cache
+def _defaults(model: type[BaseModel]) -> tuple:
+    return tuple(
+        (name, field.get_default(call_default_factory=False))
+        for name, field in model.model_fields.items()
+        if not field.is_required() and field.default_factory is None
+    )
+
+
+@functools.cache
+def _adapter(annotation) -> TypeAdapter:
+    return TypeAdapter(annotation)
+
+
+def construct(
+    model: type[BaseModel],
+    data: dict,
+    validate: frozenset = frozenset(),
+    interner: "Interner" = None,
+):
+    """Build ``model`` from trusted, alias keyed ``data`` without validating it
+
+    Nested models are constructed recursively. Fields named in ``validate``
+    (at any depth) are still validated, and coerced, by their annotation.
+    With an ``interner`` repeated values are shared (see Interner).
+    Unknown keys become extras or are dropped, following the model's config as
+    model_validate does. Like model_construct,
+    but without its per-field overhead.
+    """
+
+    plan = _plan(model)
+    values = {}
+    extra = {} if model.model_config.get("extra") == "allow" else None
+    for key, value in data.items():
+        spec = plan.get(key)
+        if spec is None:
+            if extra is not None:
+                extra[key] = value
+            continue
+        name, nested, many, convert, annotation = spec
+        if nested is not None and value is not None:
+            if many:
+                value = [construct(nested, v, validate, interner) for v in value]
+            elif interner is not None and nested in interner.keyed:
+                value = interner.share(nested, value, validate)
+            else:
+                value = construct(nested, value, validate, interner)
+        elif name in validate:
+            value = _adapter(annotation).validate_python(value)
+        elif convert is not None and value is not None:
+            value = convert(value)
+        elif interner is not None and name in interner.strings:
+            value = intern(value) if type(value) is str else value
+        values[name] = value
+    fields_set = set(values)
+    for name, default in _defaults(model):
+        if name not in values:
+            values[name] = copy.copy(default)
+
+    m = model.__new__(model)
+    object.__setattr__(m, "__dict__", values)
+    object.__setattr__(m, "__pydantic_fields_set__", fields_set)
+    object.__setattr__(m, "__pydantic_extra__", extra)
+    object.__setattr__(m, "__pydantic_private__", None)
+    return m
+
+
+# low-cardinality lookup strings repeated on most records
+_LOOKUP_STRINGS = frozenset(
+    (
+        "status",
+        "billing_type",
+        "location",
+        "tax_state",
+        "sales_tax_code",
+        "marketing_source",
+        "value",  # WorkStatus
+        "company_description",
+        "department_description",
+        "project_type_description",
+        "rate_table_description",
+        "wage_table_description",
+        "tax_local_description",
+        "client_description",
+        "invoice_format_description",
+        "email_invoice_template_description",
+        "email_client_statement_template_description",
+        "invoice_header_text",
+        "invoice_footer_text",
+    )
+)
+
+
+class Interner:
+    """Shares repeated values between decoded records
+
+    Employees are canonicalised by EmployeeKey: every record of every response
+    decoded with the same Interner refers to the one read-only SharedEmployee
+    per key (kept in ``shared``), so they compare by identity and are stored
+    once. Lookup strings (descriptions, status, billing type...) are
+    sys.intern'ed. An Interner is meant for one pull: employees renamed in
+    Ajera meanwhile are only picked up by a fresh one.
+    """
+
+    strings = _LOOKUP_STRINGS
+
+    def __init__(self):
+        from .model import Employee, SharedEmployee
+
+        self.keyed = {Employee: ("EmployeeKey", "key")}  # model -> key alias, name
+        self.frozen = {Employee: SharedEmployee}  # model -> its read-only subclass
+        self.shared = {}  # (model, key) -> the shared instance
+
+    def share(self, model: type[BaseModel], data: dict, validate=frozenset()):
+        """The shared ``model`` instance for trusted ``data``"""
+        key = (model, data.get(self.keyed[model][0]))
+        shared = self.shared.get(key)
+        if shared is None:
+            shared = construct(self.frozen[model], data, validate)
+            shared = self.shared.setdefault(key, shared)
+        return shared
+
+    def apply(self, m: BaseModel):
+        """Share the repeated values of already built models, in place"""
+        values = m.__dict__
+        for name, value in values.items():
+            if type(value) is str:
+                if name in self.strings:
+                    values[name] = intern(value)
+            elif isinstance(value, BaseModel):
+                model = type(value)
+                if model in self.keyed:
+                    key = (model, getattr(value, self.keyed[model][1]))
+                    shared = self.shared.get(key)
+                    if shared is None:
+                        shared = self.frozen[model].model_construct(
+                            value.model_fields_set,
+                            **value.__dict__,
+                            **(value.__pydantic_extra__ or {}),
+                        )
+                        shared = self.shared.setdefault(key, shared)
+                    values[name] = shared
+                else:
+                    self.apply(value)
+            elif isinstance(value, list):
+                for item in value:
+                    if isinstance(item, BaseModel):
+                        self.apply(item)
+
+
+_gc_lock = threading.Lock()
+_gc_pauses = 0
+_gc_was_enabled = False
+
+
+@contextmanager
+def paused_gc():
+    """Pause the cyclic garbage collector while building large object graphs
+
+    Decoding a big response allocates hundreds of thousands of objects, which
+    otherwise triggers repeated full collections that find nothing to free.
+    Nested pauses (from concurrent decodes) are counted.
+    """
+    global _gc_pauses, _gc_was_enabled
+    with _gc_lock:
+        if _gc_pauses == 0:
+            _gc_was_enabled = gc.isenabled()
+            gc.disable()
+        _gc_pauses += 1
+    try:
+        yield
+    finally:
+        with _gc_lock:
+            _gc_pauses -= 1
+            if _gc_pauses == 0 and _gc_was_enabled:
+                gc.enable()
+
+
+class Decoder:
+    """Turns API response bodies into response models
+
+    Modes:
+        "validate": parse with json, then validate everything (the default)
+        "json": validate straight from the raw bytes (pydantic's own parser)
+        "trusted": parse with orjson when installed and construct the models
+            without validation, except for the fields in ``validate_fields``
+        "interned": "trusted" with ``intern`` on
+
+    ``intern`` makes decoded records share their employees and lookup strings,
+    for a much smaller footprint of large loads; see Interner. With True each
+    response gets its own Interner, and ``scoped()`` gives a decoder whose
+    Interner spans the responses of one pull; an Interner passed in is shared
+    by every response this decoder decodes.
+
+    ``pause_gc`` (opt-in) pauses the garbage collector while decoding, which
+    roughly halves the decode time of large responses. The pause is process
+    wide: other threads allocating meanwhile are not collected either, so only
+    turn it on for batch jobs that decode large pulls. Without it "json" and
+    "trusted" are only about as fast as "validate" (within 5-10%) on a full
+    size GetProjects response: the collector's full passes over the new records
+    cost about what skipping validation saves, so their speed-up needs
+    ``pause_gc``.
+    """
+
+    def __init__(
+        self,
+        mode: str = "validate",
+        validate_fields=(),
+        pause_gc: bool = False,
+        intern: "bool | Interner" = False,
+    ):
+        if mode not in _MODES:
+            raise ValueError(f"decode mode must be one of {', '.join(_MODES)}")
+        if mode == "interned":
+            mode, intern = "trusted", intern or True
+        self.mode = mode
+        self.intern = bool(intern)
+        self.interner = None if intern is True else intern or None
+        self.validate_fields = frozenset(validate_fields)
+        self.pause_gc = pause_gc
+
+    def scoped(self) -> "Decoder":
+        """This decoder, or with interning a copy with a fresh Interner, to
+        share employees across the responses of one pull"""
+        if not self.intern:
+            return self
+        scoped = copy.copy(self)
+        scoped.interner = Interner()
+        return scoped
+
+    def __call__(self, request, body: bytes, call=None):
+        """``call``: a metrics.CallMetrics to record parse/validate times in"""
+        interner = self.interner
+        if interner is None and self.intern:
+            interner = Interner()
+        if self.pause_gc:
+            with paused_gc():
+                return self._decode(request, body, call, interner)
+        return self._decode(request, body, call, interner)
+
+    def _decode(self, request, body: bytes, call, interner):
+        response_type = request.response_type
+        started = time.perf_counter()
+        if self.mode == "json":
+            try:
+                ajera_resp = response_type.model_validate_json(body)
+            except ValidationError:
+                # error responses don't match the model; report them below
+                data = loads(body)
+                check_errors(request, data)
+                raise
+            check_errors(request, {"Errors": ajera_resp.errors})
+            if interner is not None:
+                interner.apply(ajera_resp)
+            if call is not None:
+                call.validate_seconds = time.perf_counter() - started
+            return ajera_resp
+
+        data = loads(body) if self.mode == "trusted" else json.loads(body)
+        parsed = time.perf_counter()
+        check_errors(request, data)
+        if self.mode == "trusted":
+            ajera_resp = construct(response_type, data, self.validate_fields, interner)
+        else:
+            ajera_resp = response_type.model_validate(data)
+            if interner is not None:
+                interner.apply(ajera_resp)
+        if call is not None:
+            call.parse_seconds = parsed - started
+            call.validate_seconds = time.perf_counter() - parsed
+        return ajera_resp
+
+
+def decoder(decode: "str | Decoder | None") -> Decoder:
+    """The Decoder for a mode name, or ``decode`` itself if already one"""
+    if decode is None:
+        return _DEFAULT
+    if isinstance(decode, str):
+        return Decoder(decode)
+    return decode
+
+
+# Ajera's messages for an expired, ended or unknown session token; other
+# errors merely mentioning a session (e.g. from CreateAPISession) are not renewed
+_SESSION_EXPIRED = re.compile(
+    r"\b(session|token)\b.*\b(expired|ended|invalid|not valid|timed out)\b"
+    r"|\binvalid (api )?(session|token)\b",
+    re.IGNORECASE,
+)
+
+
+def check_errors(request, data: dict):
+    errors = data["Errors"]
+    if errors:
+        if any(
+            _SESSION_EXPIRED.search(str(e.get("ErrorMessage", "")))
+            for e in errors
+            if isinstance(e, dict)
+        ):
+            raise AjeraSessionError(request, errors)
+        raise AjeraError(request, errors)
+
+
+_DEFAULT = Decoder()
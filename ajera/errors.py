@@ -1,2 +1,50 @@
 class AjeraError(Exception):
     pass
+
+
+class AjeraSessionError(AjeraError):
+    """Raised when Ajera rejects the session token (expired or ended)."""
+
+
+class AjeraHTTPError(AjeraError):
+    """Raised when the API answers with an HTTP error status."""
+
+    def __init__(self, method: str, status_code: int):
+        self.method = method
+        self.status_code = status_code
+        super().__init__(f"{method} failed with HTTP status {status_code}")
+
+
+class AjeraBatchError(AjeraError):
+    """Raised when some chunks of a batched pull failed; keeps the partial content."""
+
+    def __init__(self, content):
+        self.content = content
+        super().__init__(
+            f"{len(content.failed)} GetProjects chunk(s) failed: "
+            + "; ".join(f.error for f in content.failed)
+        )
+
+
+class AjeraUpdateError(AjeraError):
+    """Raised when an UpdateProjects batch failed; says which were applied."""
+
+    def __init__(self, applied, pending, error):
+        self.applied = applied  # responses of the batches Ajera accepted
+        self.pending = pending  # UpdateProjectsArguments not applied, failed first
+        self.error = error
+        super().__init__(
+            f"UpdateProjects batch {len(applied) + 1} of "
+            f"{len(applied) + len(pending)} failed after {len(applied)} "
+            f"batch(es) were applied: {error!r}"
+        )
+
+
+class AjeraConflictError(AjeraError):
+    """Raised when records were modified in Ajera after they were fetched."""
+
+    def __init__(self, conflicts):
+        self.conflicts = conflicts
+        super().__init__(
+            f"{len(conflicts)} record(s) changed in Ajera since they were fetched"
+        )
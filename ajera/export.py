@@ -0,0 +1,127 @@
+import os
+import re
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from .model import Employee, GetProjectsContent
+
+# one row per phase; the key columns let ingest join edited rows back to phases
+COLUMNS = (
+    "ProjectKey",
+    "PhaseKey",
+    "Project ID",
+    "Project",
+    "Phase ID",
+    "Phase",
+    "Status",
+    "Last Modified",
+    "Percent Complete",
+)
+EDITABLE_COLUMNS = ("Percent Complete",)
+# what project_content(fields=...) needs to fetch for the workbooks
+EXPORT_FIELDS = ("id", "description", "status", "project_manager", "percent_complete")
+
+_HIDDEN_COLUMNS = ("A", "B")  # the key columns
+
+
+def workbook_rows(content: GetProjectsContent) -> dict[int, tuple[Employee, list]]:
+    """Phase rows grouped by project manager key, as (manager, rows)"""
+    projects = {p.project_key: p for p in content.projects}
+    managers, rows = {}, defaultdict(list)
+    for phase in content.phases:
+        project = projects.get(phase.project_key)
+        manager = phase.project_manager
+        managers[manager.key] = manager
+        rows[manager.key].append(
+            (
+                phase.project_key,
+                phase.phase_key,
+                project.id if project is not None else None,
+                project.description if project is not None else None,
+                phase.id,
+                phase.description,
+                phase.status,
+                # Excel has no time zones; keep Ajera's local wall time
+                phase.last_modified_date.replace(tzinfo=None),
+                phase.percent_complete,
+            )
+        )
+    for manager_rows in rows.values():
+        manager_rows.sort(key=lambda row: (row[2] or "", row[4] or ""))
+    return {key: (managers[key], rows[key]) for key in rows}
+
+
+def workbook_name(manager: Employee) -> str:
+    name = f"{manager.last_name}_{manager.first_name}_{manager.key}"
+    return re.sub(r"[^\w-]+", "_", name) + ".xlsx"
+
+
+def write_workbook(path: str, title: str, rows: list):
+    """Write one sheet of phase rows with a streaming (write-only) workbook
+
+    The sheet is protected except for the editable columns.
+    """
+    try:
+        from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Font, Protection
+    except ImportError as e:
+        raise ImportError("writing workbooks requires openpyxl") from e
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(re.sub(r"[\[\]:*?/\\]", "", title)[:31])
+    sheet.freeze_panes = "C2"
+    sheet.protection.sheet = True
+    for column in _HIDDEN_COLUMNS:
+        sheet.column_dimensions[column].hidden = True
+
+    bold = Font(bold=True)
+    header = []
+    for name in COLUMNS:
+        cell = WriteOnlyCell(sheet, value=name)
+        cell.font = bold
+        header.append(cell)
+    sheet.append(header)
+
+    editable = [COLUMNS.index(name) for name in EDITABLE_COLUMNS]
+    unlocked = Protection(locked=False)
+    for row in rows:
+        row = list(row)
+        for i in editable:
+            cell = WriteOnlyCell(sheet, value=row[i])
+            cell.protection = unlocked
+            row[i] = cell
+        sheet.append(row)
+    workbook.save(path)
+    return path
+
+
+def export_workbooks(
+    content: GetProjectsContent, directory: str, max_workers: int = None
+) -> dict[int, str]:
+    """Write one workbook per project manager into ``directory``
+
+    The workbooks are written in parallel worker processes from the one
+    fetched ``content``. Returns the paths by project manager key.
+    """
+    os.makedirs(directory, exist_ok=True)
+    groups = workbook_rows(content)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            key: executor.submit(
+                write_workbook,
+                os.path.join(directory, workbook_name(manager)),
+                f"{manager.first_name} {manager.last_name}",
+                rows,
+            )
+            for key, (manager, rows) in groups.items()
+        }
+        return {key: future.result() for key, future in futures.items()}
+
+
+def export_pm_workbooks(directory: str, max_workers: int = None, **filters):
+    """Fetch the matching projects once (see public.project_content) and write
+    every project manager's workbook"""
+    from .public import project_content
+
+    content = project_content(fields=list(EXPORT_FIELDS), **filters)
+    return export_workbooks(content, directory, max_workers)
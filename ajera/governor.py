@@ -0,0 +1,203 @@
+import collections
+import contextvars
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from .errors import AjeraHTTPError
+from .transport import Transport
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+_PRIORITY = contextvars.ContextVar("ajera_priority", default=INTERACTIVE)
+# HTTP statuses of an overloaded or throttling server
+_CONGESTED_STATUSES = (429, 503)
+
+
+@contextmanager
+def bulk():
+    """Mark the API calls made in this block (on this thread) as bulk work,
+    which waits for interactive calls under a Governor"""
+    token = _PRIORITY.set(BULK)
+    try:
+        yield
+    finally:
+        _PRIORITY.reset(token)
+
+
+def run_bulk(fn, *args, **kwargs):
+    """``fn(*args, **kwargs)`` as bulk work; for executor.submit"""
+    with bulk():
+        return fn(*args, **kwargs)
+
+
+def _congested(e: BaseException) -> bool:
+    # network trouble and throttling statuses; not request or session errors,
+    # which say nothing about load (bodies are decoded outside the slot)
+    if isinstance(e, AjeraHTTPError):
+        return e.status_code in _CONGESTED_STATUSES
+    return isinstance(e, OSError)
+
+
+class _MethodState:
+    def __init__(self, limit: float):
+        self.limit = limit  # allowed calls in flight (AIMD adjusted)
+        self.in_flight = 0
+        self.latency = None  # seconds, exponentially weighted
+        self.calls = 0
+        self.congested = 0
+        self.decreased = None  # clock time of the last decrease
+
+
+class Governor:
+    """Adaptive concurrency and call budget for the API calls of an Ajera
+
+    Each method's in-flight limit starts at ``initial`` and adapts AIMD style:
+    it grows by ``1 / limit`` per successful call (about one per round of
+    calls) and is multiplied by ``backoff`` when a call fails from congestion
+    (network errors, throttling) or, with a ``latency_target``, takes longer
+    than that many seconds; at most once per observed latency, so one burst
+    of failures counts once. ``calls_per_minute`` caps calls over any 60s.
+    Waiting interactive calls go before bulk ones of the same method, and
+    before any bulk call when the budget is short (see ``bulk``). ``clock``
+    is the monotonic time source, replaceable in tests.
+    """
+
+    def __init__(
+        self,
+        initial: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        backoff: float = 0.5,
+        latency_target: float = None,  # seconds
+        calls_per_minute: int = None,
+        clock=time.monotonic,
+    ):
+        self.initial = initial
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_target = latency_target
+        self.calls_per_minute = calls_per_minute
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._methods = {}  # method -> _MethodState
+        self._recent = collections.deque()  # monotonic start times, last minute
+        self._waiting = collections.Counter()  # (method, priority) -> waiting calls
+
+    def wrap(self, transport) -> "GovernedTransport":
+        """``transport`` with each API call holding a slot of its method"""
+        return GovernedTransport(self, transport)
+
+    @contextmanager
+    def slot(self, method: str, priority: str = None):
+        """Hold one of ``method``'s in-flight slots for the block"""
+        priority = _PRIORITY.get() if priority is None else priority
+        state = self._acquire(method, priority)
+        started = self._clock()
+        try:
+            yield
+        except BaseException as e:
+            # other failures (bad arguments...) say nothing about load
+            self._release(state, self._clock() - started, _congested(e) or None)
+            raise
+        else:
+            latency = self._clock() - started
+            slow = self.latency_target is not None and latency > self.latency_target
+            self._release(state, latency, slow)
+
+    def _acquire(self, method: str, priority: str) -> _MethodState:
+        with self._cond:
+            state = self._methods.get(method)
+            if state is None:
+                state = self._methods[method] = _MethodState(self.initial)
+            self._waiting[method, priority] += 1
+            try:
+                while True:
+                    wait = self._budget_wait()
+                    if wait == 0.0 and self._admits(method, state, priority):
+                        break
+                    self._cond.wait(wait or None)
+            finally:
+                self._waiting[method, priority] -= 1
+            state.in_flight += 1
+            if self.calls_per_minute is not None:
+                self._recent.append(self._clock())
+            return state
+
+    def _admits(self, method: str, state: _MethodState, priority: str) -> bool:
+        if state.in_flight >= max(self.min_limit, int(state.limit)):
+            return False
+        if priority == INTERACTIVE:
+            return True
+        if self._waiting[method, INTERACTIVE]:
+            return False
+        if self.calls_per_minute is None:
+            return True
+        # leave what is left of the budget to interactive calls of any method
+        interactive = sum(n for (_, p), n in self._waiting.items() if p == INTERACTIVE)
+        return self.calls_per_minute - len(self._recent) > interactive
+
+    def _budget_wait(self) -> float:
+        """Seconds until the budget allows another call (0.0: now)"""
+        if self.calls_per_minute is None:
+            return 0.0
+        now = self._clock()
+        while self._recent and self._recent[0] <= now - 60.0:
+            self._recent.popleft()
+        if len(self._recent) < self.calls_per_minute:
+            return 0.0
+        return self._recent[0] + 60.0 - now
+
+    def _release(self, state: _MethodState, latency: float, congested: bool | None):
+        with self._cond:
+            state.in_flight -= 1
+            state.calls += 1
+            state.latency = (
+                latency
+                if state.latency is None
+                else 0.8 * state.latency + 0.2 * latency
+            )
+            now = self._clock()
+            if congested:
+                state.congested += 1
+                if state.decreased is None or now - state.decreased >= state.latency:
+                    state.limit = max(self.min_limit, state.limit * self.backoff)
+                    state.decreased = now
+            elif congested is not None:
+                state.limit = min(self.max_limit, state.limit + 1 / state.limit)
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        """method -> {"limit", "in_flight", "latency", "calls", "congested"}"""
+        with self._cond:
+            return {
+                method: {
+                    "limit": state.limit,
+                    "in_flight": state.in_flight,
+                    "latency": state.latency,
+                    "calls": state.calls,
+                    "congested": state.congested,
+                }
+                for method, state in self._methods.items()
+            }
+
+
+class GovernedTransport:
+    """A transport whose calls each hold a Governor slot, so the governor sees
+    the API's own latency and failures (see Governor.wrap)
+
+    A Transport's retried attempts each take their own slot, so every
+    throttled attempt counts, and its backoff sleeps hold none.
+    """
+
+    def __init__(self, governor: Governor, transport):
+        self.governor = governor
+        self.transport = transport
+
+    def post(self, url: str, json: dict) -> bytes:
+        slot = functools.partial(self.governor.slot, json["Method"])
+        if isinstance(self.transport, Transport):
+            return self.transport.post(url=url, json=json, attempt=slot)
+        with slot():
+            return self.transport.post(url=url, json=json)
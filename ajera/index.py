@@ -0,0 +1,156 @@
+import bisect
+import datetime
+from collections import defaultdict
+from .model import GetProjectsContent
+
+
+def _manager_key(record):
+    return record.project_manager.key
+
+
+# filter name -> value getter, per record type
+_PROJECT_KEYS = {
+    "project_key": lambda r: r.project_key,
+    "project_manager_key": _manager_key,
+    "department_key": lambda r: r.department_key,
+    "company_key": lambda r: r.company_key,
+    "status": lambda r: r.status,
+}
+_PHASE_KEYS = {
+    "project_key": lambda r: r.project_key,
+    "phase_key": lambda r: r.phase_key,
+    "parent_key": lambda r: r.parent_key,
+    "invoice_group_key": lambda r: r.invoice_group_key,
+    "project_manager_key": _manager_key,
+    "department_key": lambda r: r.department_key,
+    "status": lambda r: r.status,
+}
+
+
+class _RecordIndex:
+    """Hash indexes on ``keys`` plus a LastModifiedDate sorted index"""
+
+    def __init__(self, records, keys: dict):
+        self.keys = keys
+        self.hashes = {}
+        for name, getter in keys.items():
+            index = defaultdict(list)
+            try:
+                for record in records:
+                    index[getter(record)].append(record)
+            except AttributeError:  # projected records may lack the field
+                continue
+            self.hashes[name] = dict(index)
+        try:
+            dated = sorted(
+                ((r.last_modified_date, i) for i, r in enumerate(records)),
+            )
+        except AttributeError:
+            dated = []
+        self.modified = [d for d, _ in dated]
+        self.by_modified = [records[i] for _, i in dated]
+
+    def lookup(self, name, value) -> list:
+        if name not in self.hashes:
+            raise TypeError(f"no index on {name}")
+        index = self.hashes[name]
+        if isinstance(value, (list, tuple, set, frozenset)):
+            return [r for v in value for r in index.get(v, ())]
+        return index.get(value, [])
+
+    def where(self, modified_after=None, modified_before=None, **filters) -> list:
+        candidates = None
+        if modified_after is not None or modified_before is not None:
+            lo = (
+                0
+                if modified_after is None
+                else bisect.bisect_left(self.modified, modified_after)
+            )
+            hi = (
+                len(self.modified)
+                if modified_before is None
+                else bisect.bisect_left(self.modified, modified_before)
+            )
+            candidates = self.by_modified[lo:hi]
+        matches = sorted(
+            (
+                self.lookup(name, value)
+                for name, value in filters.items()
+                if value is not None
+            ),
+            key=len,
+        )
+        if candidates is None:
+            if not matches:
+                raise TypeError("at least one filter is required")
+            candidates = matches.pop(0)
+        for other in matches:
+            ids = {id(r) for r in other}
+            candidates = [r for r in candidates if id(r) in ids]
+        return candidates
+
+
+class ProjectIndex:
+    """Indexed, in-memory lookups over fetched projects, phases and invoice groups
+
+    ``projects``/``phases`` filter on any combination of indexed keys (a list
+    value matches any of its items) and a LastModifiedDate window, e.g.
+    ``phases(project_manager_key=4262, status="Active")`` or
+    ``phases(department_key=26, modified_after=monday)``.
+    """
+
+    def __init__(self, content: GetProjectsContent):
+        self._projects = _RecordIndex(content.projects, _PROJECT_KEYS)
+        self._phases = _RecordIndex(content.phases, _PHASE_KEYS)
+        self._invoice_groups = {g.invoice_group_key: g for g in content.invoice_groups}
+        self._invoice_groups_by_project = defaultdict(list)
+        for g in content.invoice_groups:
+            self._invoice_groups_by_project[g.project_key].append(g)
+        self._project_by_key = {p.project_key: p for p in content.projects}
+        self._phase_by_key = {p.phase_key: p for p in content.phases}
+
+    def project(self, project_key: int):
+        return self._project_by_key.get(project_key)
+
+    def phase(self, phase_key: int):
+        return self._phase_by_key.get(phase_key)
+
+    def invoice_group(self, invoice_group_key: int):
+        return self._invoice_groups.get(invoice_group_key)
+
+    def projects(
+        self,
+        modified_after: datetime.datetime = None,
+        modified_before: datetime.datetime = None,
+        **filters,  # project_key, project_manager_key, department_key, company_key, status
+    ) -> list:
+        return self._projects.where(modified_after, modified_before, **filters)
+
+    def phases(
+        self,
+        modified_after: datetime.datetime = None,
+        modified_before: datetime.datetime = None,
+        **filters,  # project_key, phase_key, parent_key, invoice_group_key,
+        # project_manager_key, department_key, status
+    ) -> list:
+        return self._phases.where(modified_after, modified_before, **filters)
+
+    def phases_of(self, project_key: int) -> list:
+        """project -> phases join"""
+        return self._phases.lookup("project_key", project_key)
+
+    def children_of(self, key: int) -> list:
+        """Phases whose ParentKey is ``key`` (a project or phase key)"""
+        return self._phases.lookup("parent_key", key)
+
+    def invoice_groups_of(self, project_key: int) -> list:
+        """project -> invoice groups join"""
+        return self._invoice_groups_by_project.get(project_key, [])
+
+    def project_of(self, record):
+        """phase or invoice group -> project join"""
+        return self._project_by_key.get(record.project_key)
+
+    def invoice_group_of(self, phase):
+        """phase -> invoice group join"""
+        return self._invoice_groups.get(phase.invoice_group_key)
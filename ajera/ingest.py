@@ -0,0 +1,148 @@
+import math
+from concurrent.futures import ProcessPoolExecutor
+from .export import EDITABLE_COLUMNS
+from .model import AjeraBaseModel, Phase
+
+_KEY_COLUMN = "PhaseKey"
+_FIELDS = {"Percent Complete": "percent_complete"}  # editable column -> Phase field
+
+
+class RowError(AjeraBaseModel):
+    path: str  # example: "pm/Hardert_Mitchell_4262.xlsx"
+    row: int  # example: 12 (spreadsheet row number)
+    phase_key: int | None  # example: 166779
+    message: str  # example: "Percent Complete must be between 0 and 100"
+
+
+class ChangeSet(AjeraBaseModel):
+    """Edited copies of the phases whose editable fields changed
+
+    ``changes`` can be passed straight to Ajera.update_projects, with the
+    fetched phases as originals.
+    """
+
+    changes: list = []  # Phase (or projected phase) records
+    errors: list[RowError] = []
+    rows: int = 0  # rows read
+
+
+def read_workbook(path: str) -> list[tuple]:
+    """(row number, PhaseKey, {editable column: value}) for each data row"""
+    try:
+        from openpyxl import load_workbook
+    except ImportError as e:
+        raise ImportError("reading workbooks requires openpyxl") from e
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows()
+        header = tuple(cell.value for cell in next(rows, ()))
+        missing = {_KEY_COLUMN, *EDITABLE_COLUMNS} - set(header)
+        if missing:
+            raise ValueError(f"{path}: missing columns {', '.join(sorted(missing))}")
+        key = header.index(_KEY_COLUMN)
+        editable = {name: header.index(name) for name in EDITABLE_COLUMNS}
+        return [
+            (
+                number,
+                row[key].value,
+                {name: _cell_value(row[i]) for name, i in editable.items()},
+            )
+            for number, row in enumerate(rows, start=2)
+            if any(cell.value is not None for cell in row)
+        ]
+    finally:
+        workbook.close()
+
+
+def _cell_value(cell):
+    # typing 75% in Excel stores 0.75 with a percent number format
+    value = cell.value
+    if isinstance(value, (int, float)) and "%" in (cell.number_format or ""):
+        return round(value * 100, 10)
+    return value
+
+
+def _percent(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.strip().rstrip("%").strip()
+        if not value:
+            return None
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        raise ValueError("Percent Complete must be a number") from None
+    if math.isnan(value) or not 0 <= value <= 100:
+        raise ValueError("Percent Complete must be between 0 and 100")
+    return value
+
+
+_PARSERS = {"Percent Complete": _percent}
+
+
+def diff_rows(path: str, rows: list[tuple], phases: dict[int, Phase], seen: set):
+    """Changed phases and row errors of one workbook's rows
+
+    ``phases`` is the PhaseKey index of the fetched phases; ``seen`` collects
+    the PhaseKeys already ingested so duplicates across workbooks are caught.
+    """
+    changes, errors = [], []
+    for number, phase_key, values in rows:
+        phase = phases.get(phase_key)
+        if phase is None:
+            key = phase_key if isinstance(phase_key, int) else None
+            message = f"unknown PhaseKey {phase_key!r}"
+            errors.append(
+                RowError(path=path, row=number, phase_key=key, message=message)
+            )
+            continue
+        if phase_key in seen:
+            message = "PhaseKey appears in more than one row"
+            errors.append(
+                RowError(path=path, row=number, phase_key=phase_key, message=message)
+            )
+            continue
+        seen.add(phase_key)
+        update = {}
+        try:
+            for column, value in values.items():
+                value = _PARSERS[column](value)
+                field = _FIELDS[column]
+                # a cleared cell leaves the field as it was
+                if value is not None and value != getattr(phase, field):
+                    update[field] = value
+        except ValueError as e:
+            errors.append(
+                RowError(path=path, row=number, phase_key=phase_key, message=str(e))
+            )
+            continue
+        if update:
+            changes.append(phase.model_copy(update=update))
+    return changes, errors
+
+
+def ingest_workbooks(
+    paths: list[str], phases: list[Phase], max_workers: int = None
+) -> ChangeSet:
+    """Read the edited workbooks concurrently and return the phases whose
+    editable fields changed, with per-row validation errors"""
+    index = {p.phase_key: p for p in phases}
+    changes, errors, seen, count = [], [], set(), 0
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(read_workbook, path) for path in paths]
+        # diffed in the given order, so duplicates are reported in later files
+        for path, future in zip(paths, futures):
+            try:
+                rows = future.result()
+            except Exception as e:  # unreadable workbook; reported, not fatal
+                errors.append(
+                    RowError(path=path, row=0, phase_key=None, message=str(e))
+                )
+                continue
+            count += len(rows)
+            path_changes, path_errors = diff_rows(path, rows, index, seen)
+            changes.extend(path_changes)
+            errors.extend(path_errors)
+    return ChangeSet(changes=changes, errors=errors, rows=count)
@@ -0,0 +1,198 @@
+"""Per-call instrumentation of Ajera API requests
+
+Every AjeraRequest.post/apost reports a CallMetrics to the subscribed sinks
+(any callable taking a CallMetrics), e.g.
+
+    stats = metrics.subscribe(metrics.StatsSink())
+    metrics.subscribe(metrics.LogSink())
+    ...
+    stats.summary()["GetProjects"]["network_seconds"]["p90"]
+    print(stats.prometheus())
+
+Nothing is measured while no sink is subscribed.
+"""
+
+import json
+import logging
+import math
+import threading
+import time
+from collections import deque
+from pydantic import BaseModel, ConfigDict
+
+_SINKS = []
+_SINKS_LOCK = threading.Lock()
+_TIMINGS = ("network_seconds", "parse_seconds", "validate_seconds")
+_SIZES = ("request_bytes", "response_bytes", "records")
+_QUANTILES = (0.5, 0.9, 0.99)
+
+
+class CallMetrics(BaseModel):
+    """What one API call cost, and where the time went"""
+
+    # built on the first measured call, not when ajera is imported
+    model_config = ConfigDict(defer_build=True)
+
+    method: str  # example: "GetProjects"
+    started: float  # time.time() when the call started
+    request_bytes: int = 0  # JSON payload size
+    response_bytes: int = 0  # response body size (as received, decompressed)
+    network_seconds: float = 0.0  # send until the whole body is received
+    parse_seconds: float = 0.0  # JSON decoding
+    validate_seconds: float = 0.0  # building (and validating) the models
+    records: int = 0  # records in the response content
+    usage_key: str | None = None  # example: "ad3d4b0e-0279-4778-b03c-a3127c8a3ef9"
+    error: str | None = None  # exception type, if the call failed
+
+    @classmethod
+    def begin(cls, method: str, payload: dict) -> "CallMetrics":
+        return cls(
+            method=method,
+            started=time.time(),
+            request_bytes=len(json.dumps(payload, separators=(",", ":"))),
+        )
+
+    def finish(self, response):
+        """Take the record count and UsageKey from the decoded response"""
+        self.usage_key = response.usage_key
+        content = response.content
+        self.records = sum(
+            len(value) for value in vars(content).values() if isinstance(value, list)
+        )
+        return response
+
+
+def subscribe(sink):
+    """Report every call to ``sink`` (a callable taking a CallMetrics)"""
+    with _SINKS_LOCK:
+        _SINKS.append(sink)
+    return sink
+
+
+def unsubscribe(sink):
+    with _SINKS_LOCK:
+        _SINKS.remove(sink)
+
+
+def observing() -> bool:
+    return bool(_SINKS)
+
+
+def emit(call: CallMetrics):
+    for sink in tuple(_SINKS):
+        try:
+            sink(call)
+        except Exception:  # a broken sink must not break API calls
+            logging.getLogger(__name__).exception("metrics sink %r failed", sink)
+
+
+class LogSink:
+    """Logs one line per call"""
+
+    def __init__(self, logger: logging.Logger = None, level: int = logging.INFO):
+        self.logger = logger if logger is not None else logging.getLogger("ajera")
+        self.level = level
+
+    def __call__(self, call: CallMetrics):
+        self.logger.log(
+            self.level,
+            "%s %s: %d B out, %d B in, network %.3fs, parse %.3fs, validate %.3fs, "
+            "%d records, usage key %s",
+            call.method,
+            call.error or "ok",
+            call.request_bytes,
+            call.response_bytes,
+            call.network_seconds,
+            call.parse_seconds,
+            call.validate_seconds,
+            call.records,
+            call.usage_key,
+        )
+
+
+class StatsSink:
+    """In-process aggregation of calls per method, with percentiles
+
+    Percentiles are over the most recent ``window`` calls of each method;
+    counts and totals cover every call.
+    """
+
+    def __init__(self, window: int = 10_000):
+        self.window = window
+        self._lock = threading.Lock()
+        self._calls = {}  # method -> deque of recent CallMetrics
+        self._totals = {}  # method -> {"calls", "errors", metric totals}
+
+    def __call__(self, call: CallMetrics):
+        with self._lock:
+            recent = self._calls.get(call.method)
+            if recent is None:
+                recent = self._calls[call.method] = deque(maxlen=self.window)
+                self._totals[call.method] = dict.fromkeys(
+                    ("calls", "errors", *_TIMINGS, *_SIZES), 0
+                )
+            recent.append(call)
+            totals = self._totals[call.method]
+            totals["calls"] += 1
+            totals["errors"] += call.error is not None
+            for metric in (*_TIMINGS, *_SIZES):
+                totals[metric] += getattr(call, metric)
+
+    def percentile(self, method: str, metric: str, q: float) -> float:
+        """``q`` (0..1) percentile of ``metric`` over recent ``method`` calls"""
+        with self._lock:
+            values = sorted(getattr(c, metric) for c in self._calls.get(method, ()))
+        return _percentile(values, q)
+
+    def summary(self) -> dict:
+        """method -> {"calls", "errors", metric -> {"total", "p50", "p90", "p99"}}"""
+        with self._lock:
+            calls = {m: list(c) for m, c in self._calls.items()}
+            totals = {m: dict(t) for m, t in self._totals.items()}
+        summary = {}
+        for method, recent in calls.items():
+            stats = {
+                "calls": totals[method]["calls"],
+                "errors": totals[method]["errors"],
+            }
+            for metric in (*_TIMINGS, *_SIZES):
+                values = sorted(getattr(c, metric) for c in recent)
+                stats[metric] = {"total": totals[method][metric]} | {
+                    f"p{round(q * 100)}": _percentile(values, q) for q in _QUANTILES
+                }
+            summary[method] = stats
+        return summary
+
+    def prometheus(self, prefix: str = "ajera") -> str:
+        """The summary in the Prometheus text exposition format"""
+        lines = []
+        summary = self.summary()
+        for name, kind in (("calls", "counter"), ("errors", "counter")):
+            lines.append(f"# TYPE {prefix}_{name}_total {kind}")
+            for method, stats in summary.items():
+                lines.append(
+                    f'{prefix}_{name}_total{{method="{method}"}} {stats[name]}'
+                )
+        for metric in (*_TIMINGS, *_SIZES):
+            lines.append(f"# TYPE {prefix}_{metric} summary")
+            for method, stats in summary.items():
+                values = stats[metric]
+                for q in _QUANTILES:
+                    lines.append(
+                        f'{prefix}_{metric}{{method="{method}",quantile="{q}"}} '
+                        f'{values[f"p{round(q * 100)}"]}'
+                    )
+                lines.append(
+                    f'{prefix}_{metric}_sum{{method="{method}"}} {values["total"]}'
+                )
+                lines.append(
+                    f'{prefix}_{metric}_count{{method="{method}"}} {stats["calls"]}'
+                )
+        return "\n".join(lines) + "\n"
+
+
+def _percentile(values: list, q: float) -> float:
+    # nearest rank on sorted values
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(q * len(values)) - 1)]
@@ -0,0 +1,266 @@
+import datetime
+import sqlite3
+import threading
+from .errors import AjeraBatchError
+from .governor import bulk
+from .model import (
+    _LIST_PROJECTS_LIMIT,
+    Employee,
+    GetProjectsContent,
+    InvoiceGroup,
+    Phase,
+    ProjectData,
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    project_key INTEGER PRIMARY KEY,
+    id TEXT,
+    status TEXT,
+    company_key INTEGER,
+    department_key INTEGER,
+    project_manager_key INTEGER,
+    last_modified_date TEXT,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS phases (
+    phase_key INTEGER PRIMARY KEY,
+    project_key INTEGER NOT NULL,
+    parent_key INTEGER,
+    invoice_group_key INTEGER,
+    status TEXT,
+    department_key INTEGER,
+    project_manager_key INTEGER,
+    last_modified_date TEXT,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS invoice_groups (
+    invoice_group_key INTEGER PRIMARY KEY,
+    project_key INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS employees (
+    employee_key INTEGER PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    name TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE INDEX IF NOT EXISTS projects_id ON projects (id);
+CREATE INDEX IF NOT EXISTS projects_status ON projects (status);
+CREATE INDEX IF NOT EXISTS projects_company ON projects (company_key);
+CREATE INDEX IF NOT EXISTS projects_department ON projects (department_key);
+CREATE INDEX IF NOT EXISTS projects_manager ON projects (project_manager_key);
+CREATE INDEX IF NOT EXISTS phases_project ON phases (project_key);
+CREATE INDEX IF NOT EXISTS phases_parent ON phases (parent_key);
+CREATE INDEX IF NOT EXISTS phases_invoice_group ON phases (invoice_group_key);
+CREATE INDEX IF NOT EXISTS phases_status ON phases (status);
+CREATE INDEX IF NOT EXISTS phases_department ON phases (department_key);
+CREATE INDEX IF NOT EXISTS phases_manager ON phases (project_manager_key);
+CREATE INDEX IF NOT EXISTS invoice_groups_project ON invoice_groups (project_key);
+"""
+
+# columns each table can be filtered on (all of them indexed)
+_PROJECT_FILTERS = (
+    "project_key",
+    "id",
+    "status",
+    "company_key",
+    "department_key",
+    "project_manager_key",
+)
+_PHASE_FILTERS = (
+    "phase_key",
+    "project_key",
+    "parent_key",
+    "invoice_group_key",
+    "status",
+    "department_key",
+    "project_manager_key",
+)
+_INVOICE_GROUP_FILTERS = ("invoice_group_key", "project_key")
+
+_HIGH_WATER_MARK = "high_water_mark"
+
+
+def _dump(record):
+    return record.model_dump_json(by_alias=True)
+
+
+def _where(filters: dict, allowed: tuple[str, ...]):
+    unknown = set(filters) - set(allowed)
+    if unknown:
+        raise TypeError(f"cannot filter on {', '.join(sorted(unknown))}")
+    clauses, params = [], []
+    for column, value in filters.items():
+        if value is None:
+            continue
+        if isinstance(value, (list, tuple, set, frozenset)):
+            value = list(value)
+            clauses.append(f"{column} IN ({', '.join('?' * len(value))})")
+            params.extend(value)
+        else:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    sql = " WHERE " + " AND ".join(clauses) if clauses else ""
+    return sql, params
+
+
+class Mirror:
+    """Local SQLite copy of Ajera projects, phases, invoice groups and employees
+
+    ``sync`` only pulls projects modified since the previous sync; queries are
+    answered from indexed local tables without touching the API.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._db:
+            self._db.executescript(_SCHEMA)
+
+    def close(self):
+        self._db.close()
+
+    @property
+    def high_water_mark(self) -> str | None:
+        """Date (YYYY-MM-DD) the last complete sync started, if any"""
+        row = self._db.execute(
+            "SELECT value FROM sync_state WHERE name = ?", (_HIGH_WATER_MARK,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def sync(self, ajera, max_workers: int = 4, cap: int = _LIST_PROJECTS_LIMIT):
+        """Pull every project modified since the last sync into the mirror
+
+        The first sync (and one whose modified projects fill a whole listing of
+        ``cap`` rows, the API's row limit) enumerates all projects with
+        Ajera.list_projects_sharded. The high-water mark only advances when
+        every chunk was fetched, so a partially failed sync is retried in full
+        next time.
+        """
+
+        # the ListProjects filter is date granular; changes made later on the
+        # day of this sync are picked up again by the next one
+        started = datetime.date.today().isoformat()
+        listed = None
+        with bulk():
+            if self.high_water_mark is not None:
+                listed = ajera.list_projects(
+                    by_earliest_modified_date=self.high_water_mark, use_cache=False
+                ).content.projects
+            if listed is None or len(listed) >= cap:
+                listed = ajera.list_projects_sharded(
+                    max_workers=max_workers, cap=cap, use_cache=False
+                )
+            keys = [p.key for p in listed]
+            content = ajera.get_projects_batched(
+                keys, max_workers=max_workers, use_cache=False
+            )
+        failed = {k for f in content.failed for k in f.requested_projects}
+        self.load(content, project_keys=[k for k in keys if k not in failed])
+        if content.failed:
+            raise AjeraBatchError(content)
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO sync_state (name, value) VALUES (?, ?)",
+                (_HIGH_WATER_MARK, started),
+            )
+        return content
+
+    def load(self, content: GetProjectsContent, project_keys: list[int] = None):
+        """Replace the mirrored records of the given (default: loaded) projects"""
+
+        if project_keys is None:
+            project_keys = [p.project_key for p in content.projects]
+        employees = {}
+        for record in (*content.projects, *content.phases):
+            for e in (
+                record.project_manager,
+                record.principal_in_charge,
+                record.marketing_contact,
+            ):
+                employees[e.key] = e
+        for g in content.invoice_groups:
+            employees[g.billing_manager.key] = g.billing_manager
+
+        stale = [(k,) for k in project_keys]
+        with self._lock, self._db:
+            for table in ("projects", "phases", "invoice_groups"):
+                self._db.executemany(
+                    f"DELETE FROM {table} WHERE project_key = ?", stale
+                )
+            self._db.executemany(
+                "INSERT OR REPLACE INTO projects VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        p.project_key,
+                        p.id,
+                        p.status,
+                        p.company_key,
+                        p.department_key,
+                        p.project_manager.key,
+                        p.last_modified_date.isoformat(),
+                        _dump(p),
+                    )
+                    for p in content.projects
+                ),
+            )
+            self._db.executemany(
+                "INSERT OR REPLACE INTO phases VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        p.phase_key,
+                        p.project_key,
+                        p.parent_key,
+                        p.invoice_group_key,
+                        p.status,
+                        p.department_key,
+                        p.project_manager.key,
+                        p.last_modified_date.isoformat(),
+                        _dump(p),
+                    )
+                    for p in content.phases
+                ),
+            )
+            self._db.executemany(
+                "INSERT OR REPLACE INTO invoice_groups VALUES (?, ?, ?)",
+                (
+                    (g.invoice_group_key, g.project_key, _dump(g))
+                    for g in content.invoice_groups
+                ),
+            )
+            self._db.executemany(
+                "INSERT OR REPLACE INTO employees VALUES (?, ?)",
+                ((e.key, _dump(e)) for e in employees.values()),
+            )
+
+    def _select(self, model, table: str, allowed: tuple[str, ...], filters: dict):
+        where, params = _where(filters, allowed)
+        rows = self._db.execute(f"SELECT data FROM {table}{where}", params)
+        return [model.model_validate_json(data) for (data,) in rows]
+
+    def projects(self, **filters) -> list[ProjectData]:
+        """Mirrored projects, e.g. ``projects(project_manager_key=4262, status="Active")``
+
+        A list or set value matches any of its items.
+        """
+        return self._select(ProjectData, "projects", _PROJECT_FILTERS, filters)
+
+    def phases(self, **filters) -> list[Phase]:
+        """Mirrored phases, e.g. ``phases(project_key=166778)``"""
+        return self._select(Phase, "phases", _PHASE_FILTERS, filters)
+
+    def invoice_groups(self, **filters) -> list[InvoiceGroup]:
+        """Mirrored invoice groups, e.g. ``invoice_groups(project_key=166778)``"""
+        return self._select(
+            InvoiceGroup, "invoice_groups", _INVOICE_GROUP_FILTERS, filters
+        )
+
+    def employees(self, employee_key: int | list[int] = None) -> list[Employee]:
+        """Mirrored employees (project managers, principals, billing managers, ...)"""
+        return self._select(
+            Employee, "employees", ("employee_key",), {"employee_key": employee_key}
+        )
@@ -1,20 +1,30 @@
-import requests
+import datetime
+import time
 from typing import Literal, ClassVar
 from pydantic import BaseModel, Field, ConfigDict
-from .authentication import _API, _PW, _USER
-from .errors import AjeraError
+from . import metrics
+from .authentication import _api, _pw, _user
+from .dates import AjeraDateTime
+from .decode import decoder
+from .transport import default_transport
 
 
 # Ajera API bits
-_HEADERS = {"Content-Type": "application/json", "Accept": "application/json"}
 _CREATE_API_SESSION = "CreateAPISession"
 _END_API_SESSION = "EndAPISession"
 _LIST_PROJECTS = "ListProjects"
 _GET_PROJECTS = "GetProjects"
+_LIST_PROJECTS_LIMIT = 1999  # rows a ListProjects call returns at most
+_GET_PROJECTS_LIMIT = 1999  # max RequestedProjects per GetProjects call
+_UPDATE_PROJECTS = "UpdateProjects"
+_UPDATE_PROJECTS_LIMIT = 1999  # projects per UpdateProjects call; same cap as GetProjects
 
 
 class AjeraBaseModel(BaseModel):
-    model_config = ConfigDict(populate_by_name=True, extra="allow")
+    # defer_build: validators are built on first use, keeping imports cheap
+    model_config = ConfigDict(
+        populate_by_name=True, extra="allow", defer_build=True
+    )
 
 
 class Employee(AjeraBaseModel):
@@ -24,12 +34,22 @@ class Employee(AjeraBaseModel):
     last_name: str = Field(alias="LastName")  # example:"Hardert"
 
 
+class SharedEmployee(Employee):
+    """An Employee shared by the records of an interned pull; read-only"""
+
+    model_config = ConfigDict(frozen=True)
+
+
 class CustomFields(AjeraBaseModel):
     """Customized fields for KBJW projects."""
 
     proposal_number: str = Field(alias="ProposalNumber")  # example:""
-    proposal_date: str | None = Field(alias="ProposalDate")  # example:"2023-09-19"
-    created_date: str | None = Field(alias="CreatedDate")  # example:"2023-09-20"
+    proposal_date: datetime.date | None = Field(
+        alias="ProposalDate"
+    )  # example:"2023-09-19"
+    created_date: datetime.date | None = Field(
+        alias="CreatedDate"
+    )  # example:"2023-09-20"
     marketing_source: str = Field(alias="MarketingSource")  # example:""
     non_disclosure_contact: bool = Field(alias="NonDisclosureContact")  # example:false
     po: str = Field(alias="PO")  # example:""
@@ -43,14 +63,18 @@ class CustomFields(AjeraBaseModel):
         alias="ConstructionCostChangeOrder"
     )  # example:0.0
     billing_comment: str = Field(alias="BillingComment")  # example:""
-    contract_date: str | None = Field(alias="ContractDate")  # example:"None"
+    contract_date: datetime.date | None = Field(
+        alias="ContractDate"
+    )  # example:"None"
     tm_estimate: float = Field(alias="TMEstimate1")  # example:0.0
     current_submittal_number: float = Field(
         alias="CurrentSubmittalNumber"
     )  # example:0.0
-    next_delivery_date: str | None = Field(alias="NextDeliveryDate")  # example:"None"
+    next_delivery_date: datetime.date | None = Field(
+        alias="NextDeliveryDate"
+    )  # example:"None"
     project_notes: str = Field(alias="ProjectNotes")  # example:""
-    projected_billing_date: str | None = Field(
+    projected_billing_date: datetime.date | None = Field(
         alias="ProjectedBillingDate"
     )  # example:"None"
     projected_billing_amount: float | None = Field(
@@ -82,7 +106,7 @@ class ProjectInfo(AjeraBaseModel):
 
 class ProjectData(AjeraBaseModel):
     project_key: int = Field(alias="ProjectKey")  # example: 166778
-    last_modified_date: str = Field(
+    last_modified_date: AjeraDateTime = Field(
         alias="LastModifiedDate"
     )  # example: "2023-09-27 09:57:49.607 GMT-04:00 (Eastern Daylight Time)"
     id: str = Field(alias="ID")  # example: "23-28222-001"
@@ -174,7 +198,7 @@ class Phase(AjeraBaseModel):
     phase_key: int = Field(alias="PhaseKey")  # example:166779
     parent_key: int = Field(alias="ParentKey")  # example:166778
     invoice_group_key: int = Field(alias="InvoiceGroupKey")  # example:49536
-    last_modified_date: str = Field(
+    last_modified_date: AjeraDateTime = Field(
         alias="LastModifiedDate"
     )  # example::"2023-09-27 09:57:49.607 GMT-04:00 (Eastern Daylight Time)"
     id: str = Field(alias="ID")  # example:"100"
@@ -224,6 +248,9 @@ class Phase(AjeraBaseModel):
     expense_cost_budget: float = Field(alias="ExpenseCostBudget")  # example:0.0
     consultant_cost_budget: float = Field(alias="ConsultantCostBudget")  # example:0.0
     percent_distribution: float = Field(alias="PercentDistribution")  # example:0.0
+    percent_complete: float | None = Field(
+        alias="PercentComplete", default=None
+    )  # example:45.0
     is_final_budget: bool = Field(alias="IsFinalBudget")  # example:false
     billing_type: str = Field(alias="BillingType")  # example:"FixedFee"
     rate_table_key: int = Field(alias="RateTableKey")  # example:1
@@ -324,6 +351,23 @@ class GetProjectsContent(Content):
     phases: list[Phase] = Field(alias="Phases")
 
 
+class UpdateProjectsContent(Content):
+    pass
+
+
+class GetProjectsChunkFailure(AjeraBaseModel):
+    """A GetProjects chunk that still failed after its retries."""
+
+    requested_projects: list[int]  # example: [1, 2, 3]
+    error: str  # example: "AjeraError(...)"
+
+
+class GetProjectsBatchContent(GetProjectsContent):
+    """Merged content of a chunked GetProjects pull."""
+
+    failed: list[GetProjectsChunkFailure] = []
+
+
 class AjeraMethodArguments(AjeraBaseModel):
     # AjeraMethodArguments is an abstract type!!!!
     pass
@@ -364,11 +408,23 @@ class GetProjectsArgs(AjeraMethodArguments):
     )  # example: [1, 2, 3]
 
 
+class UpdateProjectsArgs(AjeraMethodArguments):
+    """Changed fields only; each record carries its keys and LastModifiedDate."""
+
+    projects: list[dict] = Field(
+        alias="Projects", default=[]
+    )  # example: [{"ProjectKey": 1, "LastModifiedDate": "...", "Status": "Hold"}]
+    phases: list[dict] = Field(
+        alias="Phases", default=[]
+    )  # example: [{"ProjectKey": 1, "PhaseKey": 2, "LastModifiedDate": "...", "PercentComplete": 50.0}]
+    invoice_groups: list[dict] = Field(alias="InvoiceGroups", default=[])
+
+
 class AjeraResponse(AjeraBaseModel):
     response_code: int = Field(alias="ResponseCode")  # example: 200
     message: str = Field(alias="Message")  # example: "Success"
     errors: list = Field(alias="Errors")  # example: []
-    content: CreateSessionContent | EndSessionContent | ListProjectsContent | GetProjectsContent = Field(
+    content: CreateSessionContent | EndSessionContent | ListProjectsContent | GetProjectsContent | UpdateProjectsContent = Field(
         alias="Content"
     )
     usage_key: str = Field(
@@ -392,21 +448,57 @@ class GetProjectsResponse(AjeraResponse):
     content: GetProjectsContent = Field(alias="Content")
 
 
+class UpdateProjectsResponse(AjeraResponse):
+    content: UpdateProjectsContent = Field(alias="Content")
+
+
 class AjeraRequest(AjeraBaseModel):
     response_type: ClassVar
     method: str = Field(alias="Method")
 
-    def post(self):
-        requests_resp = requests.post(
-            url=_API,
-            headers=_HEADERS,
-            json=self.model_dump(mode="json", by_alias=True, exclude_none=True),
-        )
-        requests_resp_json = requests_resp.json()
-        if requests_resp_json["Errors"]:
-            raise AjeraError(self)
-        ajera_resp = self.response_type.model_validate(requests_resp_json)
-        return ajera_resp
+    def post(self, transport=None, decode=None):
+        """``decode``: "validate" (default), "json", "trusted" or a decode.Decoder"""
+        if transport is None:
+            transport = default_transport()
+        payload = self.payload()
+        if not metrics.observing():
+            return self.decode(transport.post(url=_api(), json=payload), decode)
+        call = metrics.CallMetrics.begin(self.method, payload)
+        try:
+            started = time.perf_counter()
+            body = transport.post(url=_api(), json=payload)
+            call.network_seconds = time.perf_counter() - started
+            call.response_bytes = len(body)
+            return call.finish(self.decode(body, decode, call))
+        except Exception as e:
+            call.error = type(e).__name__
+            raise
+        finally:
+            metrics.emit(call)
+
+    async def apost(self, transport, decode=None):
+        """``post`` through an asyncio transport such as aio.AsyncTransport"""
+        payload = self.payload()
+        if not metrics.observing():
+            return self.decode(await transport.post(url=_api(), json=payload), decode)
+        call = metrics.CallMetrics.begin(self.method, payload)
+        try:
+            started = time.perf_counter()
+            body = await transport.post(url=_api(), json=payload)
+            call.network_seconds = time.perf_counter() - started
+            call.response_bytes = len(body)
+            return call.finish(self.decode(body, decode, call))
+        except Exception as e:
+            call.error = type(e).__name__
+            raise
+        finally:
+            metrics.emit(call)
+
+    def payload(self) -> dict:
+        return self.model_dump(mode="json", by_alias=True, exclude_none=True)
+
+    def decode(self, body: bytes, decode=None, call=None):
+        return decoder(decode)(self, body, call)
 
 
 class CreateSession(AjeraRequest):
@@ -414,10 +506,12 @@ class CreateSession(AjeraRequest):
     method: Literal[_CREATE_API_SESSION] = Field(
         alias="Method", default=_CREATE_API_SESSION
     )
-    username: Literal[_USER] = Field(
-        alias="Username", default=_USER
+    username: str = Field(
+        alias="Username", default_factory=_user
     )  # example:"janedoe"
-    password: Literal[_PW] = Field(alias="Password", default=_PW)  # example:"j@ned0e"
+    password: str = Field(
+        alias="Password", default_factory=_pw, repr=False
+    )  # example:"j@ned0e"
     api_version: Literal[2] = Field(alias="APIVersion", default=2)  # 1 or 2
     use_session_cookie: bool = Field(
         alias="UseSessionCookie", default=False
@@ -432,12 +526,14 @@ class EndSession(AjeraRequest):
 
 class AjeraCall(AjeraRequest):
     args_type: ClassVar
+    read_only: ClassVar[bool] = False  # may be coalesced with identical calls
     session_token: str = Field(alias="SessionToken")
     method_arguments: AjeraMethodArguments = Field(alias="MethodArguments")
 
 
 class ListProjects(AjeraCall):
     args_type = ListProjectsArgs
+    read_only = True
     response_type = ListProjectsResponse
     method: Literal[_LIST_PROJECTS] = Field(alias="Method", default=_LIST_PROJECTS)
     method_arguments: ListProjectsArgs = Field(alias="MethodArguments")
@@ -445,6 +541,14 @@ class ListProjects(AjeraCall):
 
 class GetProjects(AjeraCall):
     args_type = GetProjectsArgs
+    read_only = True
     response_type = GetProjectsResponse
     method: Literal[_GET_PROJECTS] = Field(alias="Method", default=_GET_PROJECTS)
     method_arguments: GetProjectsArgs = Field(alias="MethodArguments")
+
+
+class UpdateProjects(AjeraCall):
+    args_type = UpdateProjectsArgs
+    response_type = UpdateProjectsResponse
+    method: Literal[_UPDATE_PROJECTS] = Field(alias="Method", default=_UPDATE_PROJECTS)
+    method_arguments: UpdateProjectsArgs = Field(alias="MethodArguments")
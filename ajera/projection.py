@@ -0,0 +1,84 @@
+import functools
+from typing import ClassVar
+from pydantic import ConfigDict, Field, create_model
+from .model import (
+    AjeraBaseModel,
+    GetProjects,
+    GetProjectsContent,
+    GetProjectsResponse,
+    InvoiceGroup,
+    Phase,
+    ProjectData,
+)
+
+# always kept, so projected records can still be joined, diffed and updated
+_KEYS = frozenset(
+    (
+        "project_key",
+        "phase_key",
+        "parent_key",
+        "invoice_group_key",
+        "last_modified_date",
+    )
+)
+
+
+class ProjectionModel(AjeraBaseModel):
+    """Base of projected record types; fields outside the projection are dropped."""
+
+    model_config = ConfigDict(extra="ignore")
+    source: ClassVar[type]  # the full record type, e.g. Phase
+
+
+@functools.cache
+def projected_model(model: type[AjeraBaseModel], fields: frozenset[str]):
+    """``model`` restricted to ``fields`` (python names) and its keys"""
+    projected = create_model(
+        f"{model.__name__}Projection",
+        __base__=ProjectionModel,
+        **{
+            name: (field.annotation, field)
+            for name, field in model.model_fields.items()
+            if name in fields or name in _KEYS
+        },
+    )
+    projected.source = model
+    return projected
+
+
+@functools.cache
+def projected_request(fields: frozenset[str]) -> type[GetProjects]:
+    """A GetProjects request whose response only materialises ``fields``
+
+    The fields apply to projects, phases and invoice groups alike; each record
+    type keeps the ones it has.
+    """
+
+    known = set().union(
+        ProjectData.model_fields, Phase.model_fields, InvoiceGroup.model_fields
+    )
+    unknown = fields - known
+    if unknown:
+        raise TypeError(f"unknown fields: {', '.join(sorted(unknown))}")
+
+    def records(model):
+        return list[projected_model(model, fields)]
+
+    content = create_model(
+        "GetProjectsContentProjection",
+        __base__=ProjectionModel,
+        projects=(records(ProjectData), Field(alias="Projects")),
+        invoice_groups=(records(InvoiceGroup), Field(alias="InvoiceGroups")),
+        phases=(records(Phase), Field(alias="Phases")),
+    )
+    content.source = GetProjectsContent
+    response = create_model(
+        "GetProjectsResponseProjection",
+        __base__=GetProjectsResponse,
+        content=(content, Field(alias="Content")),
+    )
+    return type(
+        "GetProjectsProjection",
+        (GetProjects,),
+        {"__module__": __name__, "response_type": response},
+    )
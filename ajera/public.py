@@ -1,10 +1,36 @@
+import contextvars
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from .ajera import Ajera
+from .errors import AjeraBatchError, AjeraError
+from .model import _GET_PROJECTS_LIMIT, _LIST_PROJECTS_LIMIT
 
-AJERA = Ajera()
-AJERA.start_session()
+# the shared Ajera instance, exposed as AJERA; it is created and logged in on
+# first use rather than at import
+_AJERA = None
+_AJERA_LOCK = threading.Lock()
 
 
-def project_data(
+def _ajera() -> Ajera:
+    global _AJERA
+    if _AJERA is None:
+        with _AJERA_LOCK:
+            if _AJERA is None:
+                # shared between threads, so identical concurrent calls coalesce
+                ajera_inst = Ajera(coalesce=True)
+                ajera_inst.start_session()
+                _AJERA = ajera_inst
+    return _AJERA
+
+
+def __getattr__(name):
+    if name == "AJERA":
+        return _ajera()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def project_content(
     *,
     by_status: list[str] = None,  # example: ["Preliminary", "Hold"],
     by_company: list[int] = None,  # example:[1],
@@ -16,10 +42,17 @@ def project_data(
     by_sync_to_crm: list[bool] = None,  # example: [true],
     by_earliest_modified_date: str = None,  # example: "2023-03-11",
     by_latest_modified_date: str = None,  # example: "2023-03-11",
+    max_workers: int = 4,
+    fields: list[str] = None,  # example: ["id", "description", "project_manager"]
 ):
-    project_keys = list(
-        p.key
-        for p in AJERA.list_projects(
+    """Projects, phases and invoice groups of every project matching the filters
+
+    With ``fields`` the records only hold those fields (and their keys).
+    """
+    ajera_inst = _ajera()
+    project_keys = _project_keys(
+        ajera_inst,
+        dict(
             by_status=by_status,
             by_company=by_company,
             by_name_like=by_name_like,
@@ -30,8 +63,126 @@ def project_data(
             by_sync_to_crm=by_sync_to_crm,
             by_earliest_modified_date=by_earliest_modified_date,
             by_latest_modified_date=by_latest_modified_date,
-        ).content.projects
+        ),
+    )
+    content = ajera_inst.get_projects_batched(
+        requested=project_keys, max_workers=max_workers, fields=fields
     )
-    projects = AJERA.get_projects(requested=project_keys).content.projects
+    if content.failed:
+        raise AjeraBatchError(content)
+
+    return content
+
+
+def _project_keys(ajera_inst: Ajera, filters: dict) -> list[int]:
+    """Keys of every project matching the ListProjects ``filters``
+
+    A listing that returns the API's row limit may have been cut short; then
+    the projects are enumerated with Ajera.list_projects_sharded instead.
+    """
+    listed = ajera_inst.list_projects(**filters).content.projects
+    if len(listed) < _LIST_PROJECTS_LIMIT:
+        return [p.key for p in listed]
+    filters = {k: v for k, v in filters.items() if v is not None}
+    dates = {"by_earliest_modified_date", "by_latest_modified_date"} & set(filters)
+    if dates:
+        # the sharded enumeration partitions by these itself
+        raise AjeraError(
+            f"ListProjects returned its limit of {len(listed)} projects; narrow "
+            f"the filters ({' and '.join(sorted(dates))} rule out a sharded listing)"
+        )
+    listed = ajera_inst.list_projects_sharded(cap=_LIST_PROJECTS_LIMIT, **filters)
+    return [p.key for p in listed]
+
+
+def project_data(
+    *,
+    by_status: list[str] = None,  # example: ["Preliminary", "Hold"],
+    by_company: list[int] = None,  # example:[1],
+    by_name_like: str = None,  # example: "Description",
+    by_description_like: str = None,  # example: "Project Description",
+    by_description_equals: str = None,  # example: "Project Description",
+    by_id_like: str = None,  # example: "20772",
+    by_project_type: list = None,  # example: [1, null],
+    by_sync_to_crm: list[bool] = None,  # example: [true],
+    by_earliest_modified_date: str = None,  # example: "2023-03-11",
+    by_latest_modified_date: str = None,  # example: "2023-03-11",
+    max_workers: int = 4,
+    fields: list[str] = None,  # example: ["id", "description", "project_manager"]
+):
+    """ProjectData of every project matching the filters
+
+    With ``fields`` the records only hold those fields (and their keys).
+    """
+    projects = project_content(
+        by_status=by_status,
+        by_company=by_company,
+        by_name_like=by_name_like,
+        by_description_like=by_description_like,
+        by_description_equals=by_description_equals,
+        by_id_like=by_id_like,
+        by_project_type=by_project_type,
+        by_sync_to_crm=by_sync_to_crm,
+        by_earliest_modified_date=by_earliest_modified_date,
+        by_latest_modified_date=by_latest_modified_date,
+        max_workers=max_workers,
+        fields=fields,
+    ).projects
 
     return projects
+
+
+def _iter_contents(chunk_size, prefetch, fields, decode, filters):
+    """GetProjectsContent per chunk of the listed projects, fetched in order
+
+    Up to ``prefetch`` further chunks are fetched while the current one is
+    consumed, so at most ``prefetch + 1`` decoded chunks are alive at once.
+    """
+    ajera_inst = _ajera()
+    keys = _project_keys(ajera_inst, filters)
+    with ThreadPoolExecutor(max_workers=max(prefetch, 1)) as executor:
+        pending = deque()
+        for i in range(0, len(keys), chunk_size):
+            pending.append(
+                executor.submit(
+                    contextvars.copy_context().run,
+                    ajera_inst.get_projects,
+                    requested=keys[i : i + chunk_size],
+                    fields=fields,
+                    decode=decode,
+                )
+            )
+            if len(pending) > prefetch:
+                yield pending.popleft().result().content
+        while pending:
+            yield pending.popleft().result().content
+
+
+def iter_projects(
+    *,
+    chunk_size: int = _GET_PROJECTS_LIMIT,
+    prefetch: int = 1,
+    fields: list[str] = None,  # example: ["id", "description", "project_manager"]
+    decode=None,  # example: "trusted"
+    **filters,  # ListProjects filters, as for project_data
+):
+    """Yield the ProjectData of every matching project, one chunk at a time
+
+    Unlike project_data, memory is bounded by ``chunk_size`` rather than by
+    the number of projects.
+    """
+    for content in _iter_contents(chunk_size, prefetch, fields, decode, filters):
+        yield from content.projects
+
+
+def iter_phases(
+    *,
+    chunk_size: int = _GET_PROJECTS_LIMIT,
+    prefetch: int = 1,
+    fields: list[str] = None,  # example: ["id", "description", "percent_complete"]
+    decode=None,  # example: "trusted"
+    **filters,  # ListProjects filters, as for project_data
+):
+    """Yield the Phases of every matching project, one chunk at a time"""
+    for content in _iter_contents(chunk_size, prefetch, fields, decode, filters):
+        yield from content.phases
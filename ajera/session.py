@@ -0,0 +1,249 @@
+import datetime
+import json
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from .errors import AjeraError
+from .model import CreateSession, CreateSessionContent, EndSession
+
+
+def _now():
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+class SessionManager:
+    """Owns the API session token of an Ajera instance
+
+    The token is renewed ``renew_margin`` before its SessionExpiration. With a
+    ``token_file`` the session is written to disk and picked up by later
+    processes instead of logging in again.
+    """
+
+    def __init__(
+        self,
+        transport=None,
+        token_file: str | os.PathLike = None,
+        renew_margin: datetime.timedelta = datetime.timedelta(minutes=5),
+    ):
+        self.transport = transport
+        self.token_file = token_file
+        self.renew_margin = renew_margin
+        self._lock = threading.RLock()
+        self._token = None
+        self._expiration = None  # aware datetime, None if unknown
+
+    @property
+    def active(self) -> bool:
+        return self._token is not None
+
+    @property
+    def expiration(self) -> datetime.datetime | None:
+        return self._expiration
+
+    def token(self) -> str:
+        """The session token, renewed first if it is about to expire"""
+        with self._lock:
+            if self._token is None:
+                raise AjeraError("please start_session() first")
+            if self._expiring():
+                self.renew(stale_token=self._token)
+            return self._token
+
+    def adopt(self, token: str, expiration: datetime.datetime = None):
+        """Use a token obtained elsewhere"""
+        with self._lock:
+            if self._token is not None:
+                raise AjeraError("please close_session() first")
+            self._token, self._expiration = token, expiration
+
+    def start(self):
+        """Reuse the session in ``token_file`` if still valid, else log in"""
+        with self._lock:
+            if self._token is not None:
+                raise AjeraError("cannot start session; session already active")
+            if not self._load():
+                self._create()
+
+    def renew(self, stale_token: str = None):
+        """Log in again, unless another thread already replaced ``stale_token``
+
+        The old session is not ended: it has expired, or other processes
+        sharing the token file may still be using it.
+        """
+        with self._lock:
+            if stale_token is not None and stale_token != self._token:
+                return
+            self._create()
+
+    def close(self, end: bool = None):
+        """Forget the token, ending the API session if ``end``
+
+        By default a session shared through ``token_file`` is left open for
+        other processes and any other session is ended.
+        """
+        with self._lock:
+            if self._token is None:
+                raise AjeraError("no active session")
+            if end is None:
+                end = self.token_file is None
+            if end:
+                EndSession(session_token=self._token).post(self.transport)
+                self._forget_file()
+            self._token, self._expiration = None, None
+
+    def _expiring(self) -> bool:
+        return (
+            self._expiration is not None
+            and _now() >= self._expiration - self.renew_margin
+        )
+
+    def _create(self):
+        session: CreateSessionContent = CreateSession().post(self.transport).content
+        self._token = session.session_token
+        self._expiration = datetime.datetime.fromisoformat(session.session_expiration)
+        self._save()
+
+    def _load(self) -> bool:
+        if self.token_file is None:
+            return False
+        try:
+            with open(self.token_file) as f:
+                saved = json.load(f)
+            self._token = saved["token"]
+            self._expiration = datetime.datetime.fromisoformat(saved["expiration"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+        if self._expiring():
+            self._token, self._expiration = None, None
+            return False
+        return True
+
+    def _save(self):
+        if self.token_file is None:
+            return
+        tmp = f"{self.token_file}.{os.getpid()}.tmp"
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump(
+                {"token": self._token, "expiration": self._expiration.isoformat()}, f
+            )
+        os.replace(tmp, self.token_file)
+
+    def _forget_file(self):
+        # only remove the file if it still holds this session
+        if self.token_file is None:
+            return
+        try:
+            with open(self.token_file) as f:
+                if json.load(f).get("token") == self._token:
+                    os.remove(self.token_file)
+        except (OSError, ValueError, AttributeError):
+            pass
+
+
+# put in a closed pool's idle queue to wake the workers waiting for a session
+_CLOSED = object()
+
+
+class SessionPool:
+    """``size`` independently created API sessions, handed out one worker at a
+    time
+
+    Workers ``checkout`` a SessionManager (waiting up to ``timeout`` for a free
+    one) and ``checkin`` it when done, or use ``with pool.session() as s``.
+    ``close`` ends every session; sessions checked out at that moment are
+    ended when they are checked in, and workers waiting in ``checkout`` get an
+    AjeraError.
+    """
+
+    def __init__(
+        self,
+        size: int = 4,
+        transport=None,
+        renew_margin: datetime.timedelta = datetime.timedelta(minutes=5),
+    ):
+        if size < 1:
+            raise AjeraError("a session pool needs at least one session")
+        self.size = size
+        self.transport = transport
+        self.renew_margin = renew_margin
+        self._lock = threading.Lock()
+        self._idle = queue.LifoQueue()  # reuse warm connections first
+        self._sessions = []
+        self._closed = False
+
+    @property
+    def active(self) -> bool:
+        return bool(self._sessions) and not self._closed
+
+    def start(self):
+        """Log in ``size`` times, concurrently"""
+        with self._lock:
+            if self._sessions:
+                raise AjeraError("cannot start session pool; already started")
+            sessions = [
+                SessionManager(self.transport, renew_margin=self.renew_margin)
+                for _ in range(self.size)
+            ]
+            with ThreadPoolExecutor(max_workers=self.size) as executor:
+                started = [executor.submit(s.start) for s in sessions]
+            try:
+                for future in started:
+                    future.result()
+            except BaseException:
+                for s in sessions:
+                    if s.active:
+                        s.close()
+                raise
+            self._sessions, self._closed = sessions, False
+            self._idle = queue.LifoQueue()  # without a previous close's marker
+            for s in sessions:
+                self._idle.put(s)
+
+    def checkout(self, timeout: float = None) -> SessionManager:
+        if not self.active:
+            raise AjeraError("please start_session() first")
+        idle = self._idle
+        try:
+            session = idle.get(timeout=timeout)
+        except queue.Empty:
+            raise AjeraError(f"no free session within {timeout}s") from None
+        if session is _CLOSED:
+            idle.put(_CLOSED)  # for the next waiting worker
+            raise AjeraError("the session pool was closed")
+        return session
+
+    def checkin(self, session: SessionManager):
+        with self._lock:
+            if not self._closed and session in self._sessions:
+                self._idle.put(session)
+                return
+        if session.active:
+            session.close()
+
+    @contextmanager
+    def session(self, timeout: float = None):
+        s = self.checkout(timeout)
+        try:
+            yield s
+        finally:
+            self.checkin(s)
+
+    def close(self):
+        """End the idle sessions now and the checked out ones on checkin"""
+        with self._lock:
+            if not self.active:
+                raise AjeraError("no active session")
+            self._closed, self._sessions = True, []
+        idle = []
+        while True:
+            try:
+                idle.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        self._idle.put(_CLOSED)  # wakes the workers waiting in checkout
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            for future in [executor.submit(s.close) for s in idle]:
+                future.result()
@@ -0,0 +1,41 @@
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with equal keys into one
+
+    While a call for a key is in flight, further callers with that key wait
+    for it and share its result (or its exception) instead of calling again.
+    With ``copy``, each waiting caller gets ``copy(result)`` instead.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}  # key -> Future of the call in flight
+
+    def do(self, key, call, copy=None):
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = Future()
+        if not leader:
+            result = flight.result()
+            return result if copy is None else copy(result)
+
+        try:
+            result = call()
+        except BaseException as e:
+            flight.set_exception(e)
+            raise
+        else:
+            flight.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._flights[key]
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._flights)
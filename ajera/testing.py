@@ -0,0 +1,398 @@
+"""Offline stand-ins for the Ajera API: record builders, synthetic datasets
+and a local HTTP server speaking the Ajera JSON protocol
+
+Used by the test suite and the benchmarks in bench/.
+"""
+
+import datetime
+import gzip
+import json as _json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def employee(key=4262):
+    return {
+        "EmployeeKey": key,
+        "FirstName": "Mitchell",
+        "MiddleName": "T.",
+        "LastName": "Hardert",
+    }
+
+
+def custom_fields():
+    return {
+        "ProposalNumber": "",
+        "ProposalDate": "2023-09-19",
+        "CreatedDate": "2023-09-20",
+        "MarketingSource": "",
+        "NonDisclosureContact": False,
+        "PO": "",
+        "OLDPO": "",
+        "Header": "",
+        "WorkPriority": False,
+        "ProjectConstructionCosts": False,
+        "ConstructionCostChangeOrder": False,
+        "BillingComment": "",
+        "ContractDate": None,
+        "TMEstimate1": 0.0,
+        "CurrentSubmittalNumber": 0.0,
+        "NextDeliveryDate": None,
+        "ProjectNotes": "",
+        "ProjectedBillingDate": None,
+        "ProjectedBillingAmount": 0.0,
+        "WorkStatus": {
+            "Value": "Active Design",
+            "AllowEdit": False,
+            "Values": [
+                "Active Design",
+                "Active Design - Submitted",
+                "Active Project",
+                "Approved Construction Plans",
+            ],
+        },
+    }
+
+
+def _common(key, pm_key):
+    return {
+        "ProjectKey": key,
+        "LastModifiedDate": "2023-09-27 09:57:49.607 GMT-04:00 (Eastern Daylight Time)",
+        "Description": f"Project {key}",
+        "SyncToCRM": False,
+        "CreateInCRM": False,
+        "CRMFinalSync": False,
+        "Status": "Active",
+        "SummarizeBillingGroup": False,
+        "BillingDescription": "",
+        "ProjectTypeKey": 5,
+        "ProjectTypeDescription": "Industrial",
+        "DepartmentKey": 26,
+        "DepartmentDescription": "DOH-Geotechnical",
+        "BudgetedOverheadRate": 0.0,
+        "ProjectManager": employee(pm_key),
+        "PrincipalInCharge": employee(4263),
+        "MarketingContact": employee(4264),
+        "WageTableDescription": "",
+        "IsCertified": False,
+        "RestrictTimeEntryToResourcesOnly": False,
+        "TaxState": "na",
+        "TaxLocalDescription": "",
+        "ApplySalesTax": False,
+        "SalesTaxCode": "",
+        "SalesTaxRate": 0.0,
+        "RequireTimesheetNotes": True,
+        "Notes": "",
+        "HoursCostBudget": 0.0,
+        "LaborCostBudget": 0.0,
+        "ExpenseCostBudget": 0.0,
+        "ConsultantCostBudget": 0.0,
+        "PercentDistribution": 0.0,
+        "IsFinalBudget": False,
+        "BillingType": "FixedFee",
+        "RateTableKey": 1,
+        "RateTableDescription": "KBJW - Standard Billing Rates",
+        "TotalContractAmount": 30000.0,
+        "LaborContractAmount": 30000.0,
+        "ExpenseContractAmount": 0.0,
+        "ConsultantContractAmount": 0.0,
+        "BillLaborAsTE": False,
+        "BillExpenseAsTE": True,
+        "BillConsultantAsTE": False,
+        "LockFee": False,
+        "LaborEntry": True,
+        "ExpenseConsultantEntry": True,
+        "CustomFields": custom_fields(),
+    }
+
+
+def project(key, pm_key=4262):
+    return {
+        **_common(key, pm_key),
+        "ID": f"23-{key}-001",
+        "CompanyKey": 1,
+        "CompanyDescription": "Koontz Bryant Johnson Williams, Inc.",
+        "Location": "IN, Logansport",
+        "ConstructionCost": 0.0,
+        "PercentOfConstructionCost": 0.0,
+    }
+
+
+def phase(key, phase_key, pm_key=4262):
+    return {
+        **_common(key, pm_key),
+        "PhaseKey": phase_key,
+        "ParentKey": key,
+        "InvoiceGroupKey": key * 10,
+        "ID": "100",
+        "Description": f"Phase {phase_key}",
+        "IsBillingGroup": False,
+        "ConsultantInvoiceText": "",
+        "ExpenseInvoiceText": "",
+        "LaborInvoiceText": "",
+        "PhaseInvoiceText": "",
+    }
+
+
+def invoice_group(key):
+    return {
+        "InvoiceGroupKey": key * 10,
+        "ProjectKey": key,
+        "Description": "Invoice Group",
+        "ClientKey": 4429,
+        "ClientDescription": "Infra Pipe Solutions",
+        "InvoiceFormatKey": 30,
+        "InvoiceFormatDescription": "Fixed Fee - New Format - 7/2017",
+        "EmailInvoiceTemplateKey": 1,
+        "EmailInvoiceTemplateDescription": "Default Template",
+        "EmailClientStatementTemplateDescription": "",
+        "PrintBackup": False,
+        "EmailIncludeBackup": False,
+        "BillingManager": employee(),
+        "InvoiceHeaderText": "Professional Services",
+        "InvoiceFooterText": "Terms:  Net 30 ",
+        "InvoiceScope": "",
+        "Notes": "",
+    }
+
+
+def response(content, errors=()):
+    return {
+        "ResponseCode": 200,
+        "Message": "Success",
+        "Errors": list(errors),
+        "Content": content,
+        "UsageKey": "ad3d4b0e-0279-4778-b03c-a3127c8a3ef9",
+    }
+
+
+_STATUSES = ("Active", "Active", "Active", "Inactive", "Preliminary", "Closed")
+_TIME_ZONES = (
+    ("-04:00", "Eastern Daylight Time"),
+    ("-05:00", "Eastern Standard Time"),
+)
+
+
+def _wire_date(moment: datetime.datetime, offset: str, label: str) -> str:
+    return f"{moment:%Y-%m-%d %H:%M:%S}.{moment.microsecond // 1000:03d} GMT{offset} ({label})"
+
+
+class SyntheticDataset:
+    """A reproducible, Ajera shaped database of ``projects`` projects
+
+    Each project gets 1 to 2 * ``phases_per_project`` - 1 phases (so about
+    ``phases_per_project`` on average), one of ``managers`` project managers, a
+    status and a LastModifiedDate within the last ``days`` days. ``padding``
+    adds that many characters to every record's Notes, to scale payload size.
+    Records are built on request, so large datasets cost little memory.
+    """
+
+    def __init__(
+        self,
+        projects: int = 25_000,
+        phases_per_project: int = 4,
+        managers: int = 30,
+        days: int = 3 * 365,
+        padding: int = 0,
+        seed: int = 0,
+    ):
+        rng = random.Random(seed)
+        now = datetime.datetime(2023, 10, 1, 12)
+        self.padding = "x" * padding
+        self.keys = [100_000 + i for i in range(projects)]
+        # key -> (pm key, status, phases, LastModifiedDate, modified day ISO)
+        self._meta = {}
+        for key in self.keys:
+            modified = now - datetime.timedelta(seconds=rng.randrange(days * 86_400))
+            self._meta[key] = (
+                4000 + rng.randrange(managers),
+                rng.choice(_STATUSES),
+                rng.randint(1, 2 * phases_per_project - 1),
+                _wire_date(modified, *rng.choice(_TIME_ZONES)),
+                modified.date().isoformat(),
+            )
+
+    @property
+    def phase_count(self) -> int:
+        return sum(meta[2] for meta in self._meta.values())
+
+    def list_projects(self, args: dict) -> list[dict]:
+        statuses = args.get("FilterByStatus")
+        earliest = args.get("FilterByEarliestModifiedDate")
+        latest = args.get("FilterByLatestModifiedDate")
+        listed = []
+        for key in self.keys:
+            _, status, _, _, day = self._meta[key]
+            if statuses and status not in statuses:
+                continue
+            if (earliest and day < earliest[:10]) or (latest and day > latest[:10]):
+                continue
+            listed.append(
+                {
+                    "ProjectKey": key,
+                    "ID": f"23-{key}-001",
+                    "Description": f"Project {key}",
+                }
+            )
+        return listed
+
+    def _stamp(self, record: dict, key: int) -> dict:
+        _, status, _, modified, _ = self._meta[key]
+        record["Status"] = status
+        record["LastModifiedDate"] = modified
+        record["Notes"] = self.padding
+        return record
+
+    def get_projects(self, args: dict) -> dict:
+        keys = [k for k in args["RequestedProjects"] if k in self._meta]
+        projects, phases = [], []
+        for key in keys:
+            pm_key, _, phase_count, _, _ = self._meta[key]
+            projects.append(self._stamp(project(key, pm_key), key))
+            for i in range(phase_count):
+                phases.append(self._stamp(phase(key, key * 100 + i, pm_key), key))
+        return {
+            "Projects": projects,
+            "Phases": phases,
+            "InvoiceGroups": [invoice_group(k) for k in keys],
+        }
+
+
+class FakeAjeraServer:
+    """Local HTTP server answering Ajera API calls from a SyntheticDataset
+
+    Serves CreateAPISession, ListProjects, GetProjects and EndAPISession at
+    ``url``; every call waits ``latency`` seconds first, like a distant
+    server would. ListProjects returns at most ``list_limit`` rows, if set.
+    ``post`` answers in-process, so the server can also stand in for a
+    Transport without being started. Use as a context manager, e.g.
+
+        with FakeAjeraServer(SyntheticDataset(projects=1000)) as server:
+            os.environ["AJERA_API"] = server.url
+    """
+
+    def __init__(
+        self,
+        dataset: SyntheticDataset = None,
+        latency: float = 0.0,
+        compress: bool = True,
+        list_limit: int = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.dataset = dataset if dataset is not None else SyntheticDataset()
+        self.latency = latency
+        self.compress = compress
+        self.list_limit = list_limit
+        self.statuses = []  # HTTP error statuses to answer the next calls with
+        self.requests = 0
+        self.bytes_sent = 0
+        self._tokens = set()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _handler(self))
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/ajera"
+
+    def start(self) -> "FakeAjeraServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def post(self, url: str, json: dict) -> bytes:
+        return _json.dumps(self.answer(json)).encode()
+
+    def answer(self, payload: dict) -> dict:
+        """The response to one Ajera API payload"""
+        method = payload.get("Method")
+        args = payload.get("MethodArguments") or {}
+        if method == "CreateAPISession":
+            with self._lock:
+                token = f"token{len(self._tokens) + 1}"
+                self._tokens.add(token)
+            expiration = datetime.datetime.now().astimezone() + datetime.timedelta(
+                hours=1
+            )
+            return response(
+                {
+                    "CompanyName": "Synthetic Engineering, Inc.",
+                    "UsingICRMobile": False,
+                    "SessionToken": token,
+                    "SessionExpiration": expiration.isoformat(),
+                    "APIURL": self.url,
+                    "AjeraVersion": "9.90.02",
+                    "ICRConfigFile": {
+                        "icrURL": "",
+                        "icrClientId": "",
+                        "icrUserName": "",
+                        "icrApiKey": "",
+                    },
+                }
+            )
+        if payload.get("SessionToken") not in self._tokens:
+            return response({}, errors=[{"ErrorMessage": "Session has expired"}])
+        if method == "EndAPISession":
+            with self._lock:
+                self._tokens.discard(payload["SessionToken"])
+            return response({})
+        if method == "ListProjects":
+            listed = self.dataset.list_projects(args)
+            return response({"Projects": listed[: self.list_limit]})
+        if method == "GetProjects":
+            return response(self.dataset.get_projects(args))
+        return response({}, errors=[{"ErrorMessage": f"Unknown method {method}"}])
+
+
+def _handler(server: FakeAjeraServer):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            payload = _json.loads(self.rfile.read(length))
+            if server.latency:
+                time.sleep(server.latency)
+            with server._lock:
+                status = server.statuses.pop(0) if server.statuses else 200
+            if status != 200:
+                body = b"<html>Service Unavailable</html>"
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+            body = _json.dumps(server.answer(payload)).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            if server.compress and "gzip" in self.headers.get("Accept-Encoding", ""):
+                body = gzip.compress(body, compresslevel=1)
+                self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            with server._lock:
+                server.requests += 1
+                server.bytes_sent += len(body)
+
+        def log_message(self, format, *args):  # keep benchmarks quiet
+            pass
+
+    return Handler
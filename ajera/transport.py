@@ -0,0 +1,84 @@
+import contextlib
+import functools
+import time
+from .errors import AjeraHTTPError
+
+_HEADERS = {
+    "Content-Type": "application/json",
+    "Accept": "application/json",
+    "Accept-Encoding": "gzip, deflate",
+}
+_RETRY_STATUSES = (429, 500, 502, 503, 504)
+# only these are resent after an error status: they change nothing in Ajera
+# (method names as in model.py, which imports this module)
+_READ_METHODS = ("ListProjects", "GetProjects")
+
+
+class Transport:
+    """Keep-alive HTTP transport for AjeraRequest.post
+
+    Any object with a ``post(url, json) -> bytes`` method can stand in for it.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = 10,
+        timeout: float | tuple[float, float] = (10.0, 300.0),  # (connect, read)
+        retries: int = 3,
+        backoff_factor: float = 0.5,  # sleeps 0.5s, 1s, 2s, ... between retries
+    ):
+        # imported here so that importing ajera stays cheap until a call is made
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        # urllib3 only retries failed connects, which never reached Ajera;
+        # error statuses are retried in post, for read methods only
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=0,
+            status=0,
+            backoff_factor=backoff_factor,
+            allowed_methods=None,  # every Ajera call is a POST
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+        )
+        self.session = requests.Session()
+        self.session.headers.update(_HEADERS)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def post(self, url: str, json: dict, attempt=contextlib.nullcontext) -> bytes:
+        """POST a JSON payload and return the (decompressed) response body
+
+        Raises AjeraHTTPError for error statuses, after retrying those in
+        _RETRY_STATUSES for read methods. Each attempt runs in ``attempt()``,
+        e.g. a Governor slot, which sees that attempt's error status.
+        """
+        method = json.get("Method")
+        retries = self.retries if method in _READ_METHODS else 0
+        for n in range(retries + 1):
+            try:
+                with attempt():
+                    response = self.session.post(url, json=json, timeout=self.timeout)
+                    if response.status_code >= 400:
+                        raise AjeraHTTPError(method, response.status_code)
+                return response.content
+            except AjeraHTTPError as e:
+                if e.status_code not in _RETRY_STATUSES or n == retries:
+                    raise
+            time.sleep(self.backoff_factor * 2**n)
+
+    def close(self):
+        self.session.close()
+
+
+@functools.cache
+def default_transport() -> Transport:
+    """Transport used by requests posted without an explicit one"""
+    return Transport()
@@ -0,0 +1,87 @@
+from .errors import AjeraError
+from .model import _UPDATE_PROJECTS_LIMIT, Phase, ProjectData, UpdateProjectsArgs
+
+# record type -> (UpdateProjectsArgs field, key field)
+_SECTIONS = {ProjectData: ("projects", "project_key"), Phase: ("phases", "phase_key")}
+_LAST_MODIFIED = "LastModifiedDate"
+_MISSING = object()
+
+
+def snapshot(record: ProjectData | Phase) -> dict:
+    """Wire (alias keyed) form of a record, used as the baseline for diffing"""
+    return record.model_dump(mode="json", by_alias=True)
+
+
+def _record_type(record) -> type:
+    # projected records (see projection.py) are diffed like their full type
+    return getattr(type(record), "source", type(record))
+
+
+def record_id(record: ProjectData | Phase) -> tuple[str, int]:
+    """(section, key) identifying a record, e.g. ("phases", 166779)"""
+    section, key = _SECTIONS[_record_type(record)]
+    return section, getattr(record, key)
+
+
+def changed_fields(original: dict, edited: dict) -> dict:
+    """Alias keyed fields of ``edited`` that differ from ``original``
+
+    Nested records (custom fields, employees) only contribute their changed
+    sub-fields.
+    """
+    changes = {}
+    for name, value in edited.items():
+        old = original.get(name, _MISSING)
+        if isinstance(value, dict) and isinstance(old, dict):
+            nested = changed_fields(old, value)
+            if nested:
+                changes[name] = nested
+        elif value != old:
+            changes[name] = value
+    return changes
+
+
+def build_updates(records, snapshots: dict) -> list[UpdateProjectsArgs]:
+    """Group the changed fields of ``records`` into as few UpdateProjects calls
+    as the per-call project limit allows
+
+    ``snapshots`` maps ``record_id`` to the ``snapshot`` of the fetched record.
+    Records without changes are left out.
+    """
+
+    by_project: dict[int, dict[str, list]] = {}
+    for record in records:
+        section, key = record_id(record)
+        record_type = _record_type(record)
+        key_alias = record_type.model_fields[_SECTIONS[record_type][1]].alias
+        edited = snapshot(record)
+        original = snapshots.get((section, key))
+        if original is None:
+            raise AjeraError(
+                f"no fetched state for {record_type.__name__} {key}; "
+                "use get_projects(track=True) or pass the originals"
+            )
+        changes = changed_fields(original, edited)
+        changes.pop(_LAST_MODIFIED, None)
+        if not changes:
+            continue
+        entry = {
+            "ProjectKey": edited["ProjectKey"],
+            key_alias: key,
+            # lets Ajera reject the update if the record changed meanwhile
+            _LAST_MODIFIED: original[_LAST_MODIFIED],
+            **changes,
+        }
+        by_project.setdefault(edited["ProjectKey"], {}).setdefault(section, []).append(
+            entry
+        )
+
+    project_keys = list(by_project)
+    batches = []
+    for i in range(0, len(project_keys), _UPDATE_PROJECTS_LIMIT):
+        sections = {"projects": [], "phases": []}
+        for project_key in project_keys[i : i + _UPDATE_PROJECTS_LIMIT]:
+            for section, entries in by_project[project_key].items():
+                sections[section].extend(entries)
+        batches.append(UpdateProjectsArgs(**sections))
+    return batches
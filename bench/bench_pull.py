@@ -0,0 +1,188 @@
+"""Offline benchmarks of pulling the whole project database
+
+Runs against ajera.testing.FakeAjeraServer on localhost, so results are
+reproducible and need no credentials. Each pull runs in a fresh process, so
+its peak memory is its own.
+
+    python bench/bench_pull.py                      # 25k projects, ~100k phases
+    python bench/bench_pull.py --projects 2000 --latency 0.2
+    python bench/bench_pull.py --save baseline.json
+    python bench/bench_pull.py --compare baseline.json  # exit 1 on regressions
+"""
+
+import argparse
+import json
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ajera.testing import FakeAjeraServer, SyntheticDataset  # noqa: E402
+
+# metrics where bigger is worse, compared by --compare
+_COMPARED = ("seconds", "peak_mb")
+
+
+def _peak_mb() -> float:
+    """This process's peak resident set size
+
+    VmHWM belongs to the process image, so unlike ru_maxrss it does not carry
+    the parent's peak over the fork+exec that starts a spawned worker.
+    """
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024  # kB
+    except OSError:
+        pass
+    # no procfs (macOS: bytes, but then spawn starts a fresh process anyway)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def _pull(scenario: str, decode: str, max_workers: int) -> dict:
+    """One full pull; runs in a fresh process"""
+    start_mb = _peak_mb()
+    start = time.perf_counter()
+    if scenario == "public":
+        from ajera import public
+
+        content = public.project_content(max_workers=max_workers)
+    else:
+        from ajera.ajera import Ajera
+
+        a = Ajera(decode=decode)
+        a.start_session()
+        keys = [p.key for p in a.list_projects().content.projects]
+        content = a.get_projects_batched(keys, max_workers=max_workers)
+        a.close_session()
+    seconds = time.perf_counter() - start
+    return {
+        "seconds": seconds,
+        "records": len(content.projects) + len(content.phases),
+        "start_mb": start_mb,  # the interpreter before the pull
+        "peak_mb": _peak_mb(),
+    }
+
+
+def bench_pulls(server: FakeAjeraServer, decodes, max_workers: int) -> dict:
+    results = {}
+    scenarios = [("ajera", d) for d in decodes] + [("public", "validate")]
+    for scenario, decode in scenarios:
+        requests, sent = server.requests, server.bytes_sent
+        with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as pool:
+            result = pool.submit(_pull, scenario, decode, max_workers).result()
+        result["requests"] = server.requests - requests
+        result["req_per_s"] = result["requests"] / result["seconds"]
+        result["mb_received"] = (server.bytes_sent - sent) / 2**20
+        name = f"pull[{scenario}]" if scenario == "public" else f"pull[{decode}]"
+        results[name] = result
+    return results
+
+
+def bench_decode(dataset: SyntheticDataset, decodes, repeat: int) -> dict:
+    """Decode time and allocation peak of one full size GetProjects response"""
+    from ajera.decode import Decoder
+    from ajera.model import _GET_PROJECTS_LIMIT, GetProjects, GetProjectsArgs
+    from ajera.testing import response
+
+    keys = dataset.keys[:_GET_PROJECTS_LIMIT]
+    content = dataset.get_projects({"RequestedProjects": keys})
+    records = sum(len(section) for section in content.values())
+    body = json.dumps(response(content)).encode()
+    request = GetProjects(
+        session_token="token",
+        method_arguments=GetProjectsArgs(requested_projects=keys),
+    )
+    # without pause_gc the fast modes are about as fast as "validate" (see Decoder)
+    variants = [(mode, False) for mode in decodes] + [
+        (mode, True) for mode in decodes if mode != "validate"
+    ]
+    results = {}
+    for mode, pause_gc in variants:
+        decoder = Decoder(mode, pause_gc=pause_gc)
+        decoder(request, body)  # warm up (model building, caches)
+        seconds = float("inf")
+        for _ in range(repeat):  # best of, which is the least noisy
+            start = time.perf_counter()
+            decoder(request, body)
+            seconds = min(seconds, time.perf_counter() - start)
+        tracemalloc.start()
+        decoder(request, body)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        name = f"decode[{mode}+pause_gc]" if pause_gc else f"decode[{mode}]"
+        results[name] = {
+            "seconds": seconds,
+            "records_per_s": records / seconds,
+            "peak_mb": peak / 2**20,
+            "body_mb": len(body) / 2**20,
+        }
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for name, metrics in results.items():
+        for metric in _COMPARED:
+            old = baseline.get(name, {}).get(metric)
+            new = metrics.get(metric)
+            if old and new is not None and new > old * (1 + tolerance):
+                regressions.append(f"{name} {metric}: {old:.3f} -> {new:.3f}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--projects", type=int, default=25_000)
+    parser.add_argument("--phases-per-project", type=int, default=4)
+    parser.add_argument("--padding", type=int, default=0, help="extra chars/record")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds/call")
+    parser.add_argument("--max-workers", type=int, default=4)
+    parser.add_argument(
+        "--decode", nargs="+", default=["validate", "json", "trusted", "interned"]
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="decode repetitions")
+    parser.add_argument("--skip-pull", action="store_true")
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file from --save")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    dataset = SyntheticDataset(
+        projects=args.projects,
+        phases_per_project=args.phases_per_project,
+        padding=args.padding,
+    )
+    print(f"{len(dataset.keys)} projects, {dataset.phase_count} phases")
+    results = bench_decode(dataset, args.decode, args.repeat)
+    if not args.skip_pull:
+        with FakeAjeraServer(dataset, latency=args.latency) as server:
+            os.environ["AJERA_API"] = server.url
+            os.environ.setdefault("AJERA_USER", "bench")
+            os.environ.setdefault("AJERA_PW", "bench")
+            results.update(bench_pulls(server, args.decode, args.max_workers))
+
+    for name, metrics in results.items():
+        shown = ", ".join(f"{k}={v:,.3f}" for k, v in metrics.items())
+        print(f"{name:<16} {shown}")
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+import datetime
+import json as _json
+import os
+import threading
+import pytest
+
+os.environ.setdefault("AJERA_API", "http://localhost/ajera")
+os.environ.setdefault("AJERA_USER", "janedoe")
+os.environ.setdefault("AJERA_PW", "j@ned0e")
+
+from ajera.testing import invoice_group, phase, project, response  # noqa: E402
+
+
+class FakeAjeraAPI:
+    """Answers Ajera API payloads from an in-memory set of project keys."""
+
+    def __init__(self, project_keys=(), phases_per_project=2):
+        self.project_keys = list(project_keys)
+        self.phases_per_project = phases_per_project
+        self.calls = []
+        self.fail = {}  # method -> number of calls left to fail
+        self.modified = {}  # project key -> LastModifiedDate override
+        self.session_length = datetime.timedelta(hours=1)
+        self.sessions = 0
+        self.ended = set()  # tokens rejected as expired
+        self._lock = threading.Lock()
+
+    def post(self, url, json):
+        return _json.dumps(self(json)).encode()
+
+    def __call__(self, payload):
+        self.calls.append(payload)
+        method = payload["Method"]
+        if self.fail.get(method):
+            self.fail[method] -= 1
+            return response({}, errors=[{"ErrorMessage": "fake failure"}])
+        if payload.get("SessionToken") in self.ended:
+            return response({}, errors=[{"ErrorMessage": "Session has expired"}])
+        return getattr(self, method)(payload.get("MethodArguments", {}), payload)
+
+    def CreateAPISession(self, args, payload):
+        with self._lock:
+            self.sessions += 1
+            token = f"token{self.sessions}"
+        expiration = datetime.datetime.now().astimezone() + self.session_length
+        return response(
+            {
+                "CompanyName": "Koontz Bryant Johnson Williams, INC.",
+                "UsingICRMobile": True,
+                "SessionToken": token,
+                "SessionExpiration": expiration.isoformat(),
+                "APIURL": "http://localhost/ajera",
+                "AjeraVersion": "9.90.02",
+                "ICRConfigFile": {
+                    "icrURL": "deltek",
+                    "icrClientId": "",
+                    "icrUserName": "",
+                    "icrApiKey": "",
+                },
+            }
+        )
+
+    def EndAPISession(self, args, payload):
+        return response({})
+
+    def ListProjects(self, args, payload):
+        projects = [
+            {"ProjectKey": k, "ID": f"23-{k}-001", "Description": f"Project {k}"}
+            for k in self.project_keys
+        ]
+        return response({"Projects": projects})
+
+    def GetProjects(self, args, payload):
+        keys = args["RequestedProjects"]
+        projects = [project(k) for k in keys]
+        phases = [
+            phase(k, k * 100 + i) for k in keys for i in range(self.phases_per_project)
+        ]
+        for record in (*projects, *phases):
+            if record["ProjectKey"] in self.modified:
+                record["LastModifiedDate"] = self.modified[record["ProjectKey"]]
+        return response(
+            {
+                "Projects": projects,
+                "Phases": phases,
+                "InvoiceGroups": [invoice_group(k) for k in keys],
+            }
+        )
+
+    def UpdateProjects(self, args, payload):
+        return response({})
+
+
+@pytest.fixture()
+def fake_api():
+    """A transport answering from FakeAjeraAPI instead of the network"""
+    return FakeAjeraAPI()
+
+
+@pytest.fixture()
+def session(fake_api):
+    """An Ajera logged in to fake_api"""
+    from ajera.ajera import Ajera
+
+    a = Ajera(transport=fake_api)
+    a.start_session()
+    return a
+
+
+@pytest.fixture()
+def content(session):
+    """GetProjects content of three fake projects"""
+    return session.get_projects([1, 2, 3]).content
+
+
+@pytest.fixture()
+def public_ajera(fake_api, monkeypatch):
+    """ajera.public's shared instance, logged in to fake_api"""
+    import ajera.public
+    from ajera.ajera import Ajera
+
+    a = Ajera(transport=fake_api)
+    a.start_session()
+    monkeypatch.setattr(ajera.public, "_AJERA", a)
+    return a
@@ -0,0 +1,60 @@
+import asyncio
+from ajera.aio import AsyncAjera, async_ajera
+
+
+class AsyncFakeTransport:
+    def __init__(self, api):
+        self.api = api
+        self.in_flight = self.max_in_flight = 0
+
+    async def post(self, url, json):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return self.api.post(url, json)
+
+
+def test_async_calls(fake_api):
+    fake_api.project_keys = [1, 2, 3]
+
+    async def run():
+        async with async_ajera(AsyncFakeTransport(fake_api)) as a:
+            listed = await a.list_projects()
+            keys = [p.key for p in listed.content.projects]
+            return await a.get_projects(requested=keys)
+
+    content = asyncio.run(run()).content
+    assert [p.project_key for p in content.projects] == [1, 2, 3]
+    assert [c["Method"] for c in fake_api.calls] == [
+        "CreateAPISession",
+        "ListProjects",
+        "GetProjects",
+        "EndAPISession",
+    ]
+
+
+def test_async_batched_caps_in_flight(fake_api):
+    transport = AsyncFakeTransport(fake_api)
+    fake_api.fail["GetProjects"] = 1
+
+    async def run():
+        a = AsyncAjera(transport, max_in_flight=2)
+        await a.start_session()
+        return await a.get_projects_batched(list(range(1, 11)), chunk_size=2)
+
+    content = asyncio.run(run())
+    assert [p.project_key for p in content.projects] == list(range(1, 11))
+    assert content.failed == []
+    assert transport.max_in_flight == 2
+
+
+def test_async_renews_expired_token(fake_api):
+    async def run():
+        a = AsyncAjera(AsyncFakeTransport(fake_api))
+        await a.start_session()
+        fake_api.ended.add(a.token)
+        await a.list_projects()
+        return a.token
+
+    assert asyncio.run(run()) == "token2"
@@ -0,0 +1,117 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from ajera.ajera import Ajera
+from ajera.errors import AjeraError
+from ajera.testing import FakeAjeraServer, SyntheticDataset
+
+
+def test_get_projects_batched_merges_chunks(session, fake_api):
+    keys = list(range(1, 26))
+    content = session.get_projects_batched(keys, chunk_size=10, max_workers=3)
+
+    gp_calls = [c for c in fake_api.calls if c["Method"] == "GetProjects"]
+    chunk_sizes = [len(c["MethodArguments"]["RequestedProjects"]) for c in gp_calls]
+    assert sorted(chunk_sizes) == [5, 10, 10]
+    assert [p.project_key for p in content.projects] == keys
+    assert len(content.phases) == 2 * len(keys)
+    assert len(content.invoice_groups) == len(keys)
+    assert content.failed == []
+
+
+def test_get_projects_batched_retries_chunk(session, fake_api):
+    fake_api.fail["GetProjects"] = 1
+    content = session.get_projects_batched([1, 2, 3], chunk_size=2, max_workers=1)
+    assert [p.project_key for p in content.projects] == [1, 2, 3]
+    assert content.failed == []
+
+
+def test_get_projects_batched_reports_failed_chunk(session, fake_api):
+    fake_api.fail["GetProjects"] = 2
+    content = session.get_projects_batched(
+        [1, 2, 3], chunk_size=2, max_workers=1, retries=1
+    )
+    assert [p.project_key for p in content.projects] == [3]
+    assert [f.requested_projects for f in content.failed] == [[1, 2]]
+
+
+def test_get_projects_batched_rejects_oversized_chunks(session):
+    with pytest.raises(AjeraError):
+        session.get_projects_batched([1], chunk_size=2000)
+
+
+def test_calls_go_through_instance_transport(fake_api):
+    a = Ajera(transport=fake_api)
+    a.start_session()
+    a.list_projects()
+    a.get_projects(requested=[1])
+    a.close_session()
+    assert [c["Method"] for c in fake_api.calls] == [
+        "CreateAPISession",
+        "ListProjects",
+        "GetProjects",
+        "EndAPISession",
+    ]
+
+
+def test_list_projects_sharded_splits_capped_windows():
+    dataset = SyntheticDataset(projects=300)
+    server = FakeAjeraServer(dataset, list_limit=50)
+    a = Ajera(transport=server)
+    a.start_session()
+
+    listed = a.list_projects_sharded(by_status=["Active", "Closed"], cap=50)
+    expected = dataset.list_projects({"FilterByStatus": ["Active", "Closed"]})
+    assert [p.key for p in listed] == [p["ProjectKey"] for p in expected]
+    assert len(listed) > 50  # windows that hit the cap were split
+
+    crowded = FakeAjeraServer(SyntheticDataset(projects=300, days=1), list_limit=50)
+    a = Ajera(transport=crowded)
+    a.start_session()
+    with pytest.raises(AjeraError, match="partition further"):
+        a.list_projects_sharded(cap=50)
+    server.stop()
+    crowded.stop()
+
+
+def test_coalesce_shares_identical_concurrent_calls(fake_api):
+    entered, release = threading.Event(), threading.Event()
+
+    class Gated:
+        def post(self, url, json):
+            if json["Method"] == "GetProjects":
+                entered.set()
+                release.wait(5)
+            return fake_api.post(url, json)
+
+    a = Ajera(transport=Gated(), coalesce=True)
+    a.start_session()
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        same = [executor.submit(a.get_projects, [1, 2]) for _ in range(5)]
+        entered.wait(5)
+        other = executor.submit(a.get_projects, [3])
+        time.sleep(0.2)  # let the identical callers join the flight
+        release.set()
+        results = [f.result() for f in same]
+
+    # one call, but every caller gets records of its own to edit
+    assert all(r == results[0] for r in results)
+    assert len({id(r.content.phases[0]) for r in results}) == 5
+    assert len(other.result().content.projects) == 1
+    requested = [
+        c["MethodArguments"]["RequestedProjects"]
+        for c in fake_api.calls
+        if c["Method"] == "GetProjects"
+    ]
+    assert sorted(requested) == [[1, 2], [3]]
+
+
+def test_tracked_calls_are_not_coalesced(fake_api):
+    a = Ajera(transport=fake_api, coalesce=True)
+    a.start_session()
+    flights = []
+    a._flights.do = lambda key, call, copy=None: flights.append(key) or call()
+    a.get_projects([1])
+    a.get_projects([1], track=True)
+    assert len(flights) == 1
@@ -0,0 +1,79 @@
+import datetime
+import pytest
+from ajera.ajera import Ajera
+from ajera.archive import Archive, RecordingTransport, ReplayTransport
+from ajera.errors import AjeraError
+from ajera.testing import FakeAjeraServer, SyntheticDataset
+
+
+@pytest.fixture()
+def archive(tmp_path):
+    with Archive(tmp_path / "archive") as archive:
+        yield archive
+
+
+def test_record_then_replay(archive, fake_api):
+    fake_api.project_keys = [1, 2]
+    a = Ajera(transport=RecordingTransport(fake_api, archive))
+    a.start_session()
+    listed = a.list_projects()
+    fetched = a.get_projects([1, 2])
+    a.close_session()
+
+    entries = archive.entries()
+    assert [e["method"] for e in entries] == ["ListProjects", "GetProjects"]
+    assert entries[1]["arguments"] == {"RequestedProjects": [1, 2]}
+    assert archive.entries(method="GetProjects")[0]["id"] == entries[1]["id"]
+
+    calls = len(fake_api.calls)
+    for use_mmap in (True, False):
+        replay = Ajera(transport=ReplayTransport(archive, use_mmap=use_mmap))
+        replay.start_session()
+        assert replay.list_projects() == listed
+        assert replay.get_projects([1, 2]) == fetched
+        with pytest.raises(AjeraError, match="no archived GetProjects"):
+            replay.get_projects([3])
+        replay.close_session()
+    assert len(fake_api.calls) == calls
+
+
+def test_replay_as_of_and_fallback(archive, fake_api):
+    fake_api.project_keys = [1]
+    payload = {"Method": "ListProjects", "SessionToken": "t", "MethodArguments": {}}
+    first = archive.append(payload, b"old", recorded=1_000.0)
+    archive.append(payload, b"new", recorded=2_000.0)
+
+    as_of = datetime.datetime.fromtimestamp(1_500.0)
+    assert archive.find(payload, as_of) == first
+    assert ReplayTransport(archive, as_of=as_of).post("", payload) == b"old"
+    assert ReplayTransport(archive).post("", payload) == b"new"
+
+    replay = Ajera(transport=ReplayTransport(archive, fallback=fake_api))
+    replay.start_session()
+    assert replay.get_projects([1]).content.projects[0].project_key == 1
+
+
+def test_replay_fallback_uses_a_real_session(archive):
+    server = FakeAjeraServer(SyntheticDataset(projects=3))  # rejects unknown tokens
+    replay = Ajera(transport=ReplayTransport(archive, fallback=server))
+    replay.start_session()
+    assert replay.token != "replay"
+    key = server.dataset.keys[0]
+    assert replay.get_projects([key]).content.projects[0].project_key == key
+    replay.close_session()
+
+
+def test_unknown_body(archive):
+    with pytest.raises(AjeraError):
+        archive.body(42)
+
+
+def test_credentials_are_not_archived(archive, fake_api, tmp_path):
+    a = Ajera(transport=RecordingTransport(fake_api, archive))
+    a.start_session()
+    a.list_projects()
+    a.close_session()
+    assert len(archive.entries()) == 1
+    for f in (tmp_path / "archive").iterdir():
+        data = f.read_bytes()
+        assert b"j@ned0e" not in data and b"token1" not in data
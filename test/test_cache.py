@@ -0,0 +1,130 @@
+import json
+import sqlite3
+import pytest
+from ajera.ajera import Ajera
+from ajera.cache import ResponseCache
+
+
+def _methods(fake_api):
+    return [c["Method"] for c in fake_api.calls if c["Method"] != "CreateAPISession"]
+
+
+def _requested(fake_api):
+    return [
+        c["MethodArguments"]["RequestedProjects"]
+        for c in fake_api.calls
+        if c["Method"] == "GetProjects"
+    ]
+
+
+@pytest.fixture()
+def session(fake_api):
+    a = Ajera(transport=fake_api, cache=ResponseCache())
+    a.start_session()
+    return a
+
+
+def test_get_projects_fetches_only_missing(session, fake_api):
+    session.get_projects([1, 2])
+    content = session.get_projects([3, 2, 1]).content
+
+    assert _requested(fake_api) == [[1, 2], [3]]
+    assert [p.project_key for p in content.projects] == [3, 2, 1]
+    assert [p.phase_key for p in content.phases] == [300, 301, 200, 201, 100, 101]
+    assert [g.project_key for g in content.invoice_groups] == [3, 2, 1]
+
+
+def test_hits_are_fresh_models(session, fake_api):
+    first = session.get_projects([1]).content.phases[0]
+    first.description = "edited"
+    second = session.get_projects([1]).content.phases[0]
+    assert second.description == "Phase 100"
+    assert _requested(fake_api) == [[1]]
+
+
+def test_projections_are_cached_separately(session, fake_api):
+    session.get_projects([1])
+    phase = session.get_projects([1], fields=["description"]).content.phases[0]
+    assert set(type(phase).model_fields) >= {"description", "phase_key"}
+    assert _requested(fake_api) == [[1], [1]]
+
+
+def test_list_projects_cached_per_arguments(session, fake_api):
+    session.list_projects(by_status=["Active"])
+    session.list_projects(by_status=["Active"])
+    session.list_projects(by_status=["Hold"])
+    session.list_projects(by_status=["Hold"], use_cache=False)
+    assert _methods(fake_api) == ["ListProjects"] * 3
+
+
+def test_ttl_expiry(fake_api):
+    a = Ajera(transport=fake_api, cache=ResponseCache(ttl={"GetProjects": 0}))
+    a.start_session()
+    a.get_projects([1])
+    a.get_projects([1])
+    assert _requested(fake_api) == [[1], [1]]
+
+
+def test_tracked_fetch_bypasses_cache_and_update_invalidates(session, fake_api):
+    session.get_projects([1])
+    content = session.get_projects([1], track=True).content
+    content.phases[0].percent_complete = 30.0
+    session.update_projects(content.phases)
+    session.get_projects([1])
+    # cached, tracked (fresh), conflict check, re-fetch after the update
+    assert _requested(fake_api) == [[1], [1], [1], [1]]
+
+
+def test_revalidate_drops_modified_projects(session, fake_api):
+    session.get_projects([1, 2])
+    fake_api.project_keys = [2]  # ListProjects: modified since today
+    assert session.cache.revalidate(session) == [2]
+    session.get_projects([1, 2])
+    assert _requested(fake_api) == [[1, 2], [2]]
+
+
+def test_memory_bound_evicts_least_recent():
+    cache = ResponseCache(max_bytes=1)
+    cache.put("a", b"xx", "GetProjects")
+    assert cache.get("a") is None
+
+
+def test_disk_tier_outlives_instance(fake_api, tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    first = Ajera(transport=fake_api, cache=ResponseCache(path=path))
+    first.start_session()
+    first.get_projects([1])
+
+    second = Ajera(transport=fake_api, cache=ResponseCache(path=path))
+    second.start_session()
+    content = second.get_projects([1]).content
+    assert content.projects[0].project_key == 1
+    assert _requested(fake_api) == [[1]]
+
+
+def test_disk_tier_stores_plain_json(fake_api, tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    a = Ajera(transport=fake_api, cache=ResponseCache(path=path))
+    a.start_session()
+    a.get_projects([1])
+    a.list_projects()
+
+    db = sqlite3.connect(path)
+    rows = db.execute("SELECT value, phases, groups FROM responses").fetchall()
+    assert len(rows) == 2
+    for row in rows:
+        for blob in filter(None, row):
+            json.loads(b"[%s]" % blob)  # a record, or comma-joined records
+    a.cache._entries.clear()
+    a.list_projects()
+    assert a.get_projects([1]).content.phases
+    assert _methods(fake_api) == ["GetProjects", "ListProjects"]
+
+
+def test_disk_tier_leaves_other_tables_alone(tmp_path):
+    path = str(tmp_path / "shared.sqlite")
+    with sqlite3.connect(path) as db:
+        db.execute("CREATE TABLE cache (name TEXT)")
+    ResponseCache(path=path)
+    with sqlite3.connect(path) as db:
+        assert db.execute("SELECT COUNT(*) FROM cache").fetchone() == (0,)
@@ -0,0 +1,26 @@
+import pytest
+from ajera.columnar import read_snapshot, write_snapshot
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.mark.parametrize("format", ["parquet", "arrow"])
+def test_snapshot_round_trip(content, tmp_path, format):
+    write_snapshot(content, str(tmp_path), format=format)
+    tables = read_snapshot(str(tmp_path))
+
+    assert tables["projects"].num_rows == 3
+    assert tables["phases"].num_rows == 6
+    assert tables["invoice_groups"].num_rows == 3
+    phases = tables["phases"]
+    assert phases.column("phase_key").to_pylist() == [100, 101, 200, 201, 300, 301]
+    assert set(phases.column("project_manager_key").to_pylist()) == {4262}
+    assert "custom_fields_work_status_value" in phases.column_names
+    assert tables["invoice_groups"].column("billing_manager_last_name")[0].as_py() == (
+        "Hardert"
+    )
+
+
+def test_unknown_format(content, tmp_path):
+    with pytest.raises(ValueError):
+        write_snapshot(content, str(tmp_path), format="csv")
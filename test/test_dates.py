@@ -0,0 +1,46 @@
+import datetime
+import json
+import pickle
+import pytest
+from ajera.dates import AjeraDateTime, parse_datetime
+from ajera.decode import Decoder
+from ajera.model import GetProjects, GetProjectsArgs, Phase
+from conftest import FakeAjeraAPI, phase
+
+_WIRE = "2023-09-27 09:57:49.607 GMT-04:00 (Eastern Daylight Time)"
+
+
+def test_parse_datetime():
+    parsed = parse_datetime(_WIRE)
+    assert parsed == datetime.datetime(
+        2023, 9, 27, 13, 57, 49, 607000, tzinfo=datetime.timezone.utc
+    )
+    assert parsed.label == "Eastern Daylight Time"
+    assert parsed.wire() == _WIRE
+    assert pickle.loads(pickle.dumps(parsed)).wire() == _WIRE
+    assert parse_datetime("2024-01-02T08:00:00-05:00").wire() == (
+        "2024-01-02 08:00:00.000 GMT-05:00"
+    )
+
+
+def test_models_round_trip_wire_format():
+    record = Phase.model_validate(phase(1, 100))
+    assert isinstance(record.last_modified_date, AjeraDateTime)
+    assert record.custom_fields.proposal_date == datetime.date(2023, 9, 19)
+    dumped = record.model_dump(mode="json", by_alias=True)
+    assert dumped["LastModifiedDate"] == _WIRE
+    assert dumped["CustomFields"]["ProposalDate"] == "2023-09-19"
+    with pytest.raises(ValueError):
+        Phase.model_validate({**phase(1, 100), "LastModifiedDate": "yesterday"})
+
+
+def test_trusted_decode_parses_dates():
+    body = json.dumps(FakeAjeraAPI().GetProjects({"RequestedProjects": [1]}, None))
+    request = GetProjects(
+        session_token="token", method_arguments=GetProjectsArgs(requested_projects=[1])
+    )
+    record = Decoder("trusted")(request, body.encode()).content.phases[0]
+    assert type(record.last_modified_date) is AjeraDateTime
+    assert record.last_modified_date.wire() == _WIRE
+    assert record.custom_fields.created_date == datetime.date(2023, 9, 20)
+    assert record.custom_fields.contract_date is None
@@ -0,0 +1,103 @@
+import json
+import pytest
+from pydantic import ValidationError
+from ajera.ajera import Ajera
+from ajera.decode import Decoder
+from ajera.errors import AjeraError
+from ajera.model import GetProjects, GetProjectsArgs
+from conftest import FakeAjeraAPI, response
+
+
+@pytest.fixture()
+def body():
+    api = FakeAjeraAPI()
+    return json.dumps(api.GetProjects({"RequestedProjects": [1, 2]}, None)).encode()
+
+
+@pytest.fixture()
+def request_model():
+    return GetProjects(
+        session_token="token", method_arguments=GetProjectsArgs(requested_projects=[1])
+    )
+
+
+@pytest.mark.parametrize("mode", ["json", "trusted", "interned"])
+def test_modes_match_validation(request_model, body, mode):
+    expected = request_model.decode(body)
+    decoded = request_model.decode(body, mode)
+    assert decoded.content.phases[1].project_manager.key == 4262
+    # warnings: trusted decoding keeps e.g. Phase.sales_tax_rate as sent (float)
+    assert decoded.model_dump(warnings=False) == expected.model_dump()
+
+
+def test_trusted_validates_requested_fields(request_model, body):
+    data = json.loads(body)
+    data["Content"]["Projects"][0]["ProjectKey"] = "1"
+    data["Content"]["Projects"][0]["CompanyKey"] = "1"
+    body = json.dumps(data).encode()
+
+    decoded = request_model.decode(body, Decoder("trusted", ["project_key"]))
+    project = decoded.content.projects[0]
+    assert project.project_key == 1
+    assert project.company_key == "1"  # trusted as is
+
+
+@pytest.mark.parametrize("mode", ["validate", "json", "trusted"])
+def test_modes_report_api_errors(request_model, mode):
+    body = json.dumps(response({}, errors=[{"ErrorMessage": "nope"}])).encode()
+    with pytest.raises(AjeraError):
+        request_model.decode(body, mode)
+
+
+def test_ajera_decode_mode(fake_api):
+    a = Ajera(transport=fake_api, decode="trusted")
+    a.start_session()
+    content = a.get_projects([1]).content
+    assert content.projects[0].project_manager.first_name == "Mitchell"
+
+
+@pytest.mark.parametrize("mode", ["validate", "trusted"])
+def test_interned_records_share_values(request_model, body, mode):
+    decoder = Decoder(mode, intern=True).scoped()
+    first = request_model.decode(body, decoder).content
+    second = request_model.decode(body, decoder).content
+
+    managers = {id(p.project_manager) for p in (*first.phases, *second.projects)}
+    assert len(managers) == 1
+    assert first.phases[0].principal_in_charge is second.phases[1].principal_in_charge
+    assert first.projects[0].department_description is (
+        second.phases[2].department_description
+    )
+    assert first.phases[0].custom_fields.work_status.value is (
+        second.phases[1].custom_fields.work_status.value
+    )
+    assert len(decoder.interner.shared) == 3  # one per EmployeeKey
+    with pytest.raises(ValidationError):
+        first.phases[0].project_manager.last_name = "Renamed"
+
+
+def test_interning_is_scoped(request_model, body, fake_api):
+    decoder = Decoder("interned")
+    first = request_model.decode(body, decoder).content
+    second = request_model.decode(body, decoder).content
+    assert first.phases[0].project_manager is first.phases[1].project_manager
+    assert first.phases[0].project_manager is not second.phases[0].project_manager
+
+    a = Ajera(transport=fake_api, decode="interned")
+    a.start_session()
+    content = a.get_projects_batched([1, 2], chunk_size=1)
+    managers = {id(p.project_manager) for p in (*content.projects, *content.phases)}
+    assert len(managers) == 1
+
+
+def test_gc_pause_restores_state(request_model, body):
+    import gc
+
+    assert not Decoder("trusted").pause_gc
+    request_model.decode(body, Decoder("trusted", pause_gc=True))
+    assert gc.isenabled()
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        Decoder("fast")
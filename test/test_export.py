@@ -0,0 +1,31 @@
+import pytest
+from ajera.export import COLUMNS, export_pm_workbooks, export_workbooks
+
+openpyxl = pytest.importorskip("openpyxl")
+
+
+def test_one_workbook_per_manager(content, tmp_path):
+    content.phases[0].project_manager.key = 1111
+    content.phases[0].project_manager.last_name = "Doe"
+    paths = export_workbooks(content, str(tmp_path), max_workers=2)
+
+    assert set(paths) == {1111, 4262}
+    rows = list(openpyxl.load_workbook(paths[4262]).active.values)
+    assert rows[0] == COLUMNS
+    assert [row[1] for row in rows[1:]] == [101, 200, 201, 300, 301]
+    assert rows[1][2:6] == ("23-1-001", "Project 1", "100", "Phase 101")
+
+
+def test_only_percent_complete_is_editable(content, tmp_path):
+    paths = export_workbooks(content, str(tmp_path), max_workers=1)
+    sheet = openpyxl.load_workbook(paths[4262]).active
+    assert sheet.protection.sheet
+    assert sheet["I2"].protection.locked is False
+    assert sheet["F2"].protection.locked is True
+
+
+def test_export_pm_workbooks_fetches_once(public_ajera, fake_api, tmp_path):
+    fake_api.project_keys = [1, 2]
+    paths = export_pm_workbooks(str(tmp_path))
+    assert list(paths) == [4262]
+    assert [c["Method"] for c in fake_api.calls].count("GetProjects") == 1
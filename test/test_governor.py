@@ -0,0 +1,207 @@
+import json
+import threading
+import time
+import pytest
+from pydantic import ValidationError
+from ajera.ajera import Ajera
+from ajera.errors import AjeraError, AjeraHTTPError
+from ajera.model import Employee
+from ajera.testing import FakeAjeraServer, SyntheticDataset
+from ajera.transport import Transport
+from ajera import governor
+from ajera.governor import BULK, INTERACTIVE, Governor, bulk
+
+
+def _call(gov, method="GetProjects", error=None, priority=None):
+    with gov.slot(method, priority):
+        if error is not None:
+            raise error
+
+
+def test_aimd_limit():
+    gov = Governor(initial=4)
+    with pytest.raises(OSError):
+        _call(gov, error=OSError("reset"))
+    assert gov.stats()["GetProjects"]["limit"] == 2
+    with pytest.raises(AjeraError):
+        _call(gov, error=AjeraError("bad arguments"))  # not congestion
+    _call(gov)
+    _call(gov)
+    stats = gov.stats()["GetProjects"]
+    assert stats["limit"] == pytest.approx(2 + 1 / 2 + 1 / 2.5)
+    assert stats["calls"] == 4 and stats["congested"] == 1
+    assert "ListProjects" not in gov.stats()
+
+
+def test_only_transport_failures_are_congestion():
+    try:
+        Employee.model_validate({})
+    except ValidationError as e:
+        invalid = e
+    congested = (
+        OSError("reset"),
+        AjeraHTTPError("GetProjects", 429),
+        AjeraHTTPError("GetProjects", 503),
+    )
+    other = (
+        invalid,
+        json.JSONDecodeError("truncated", "{", 1),
+        ValueError("bad argument"),
+        TypeError("unknown fields"),
+        AjeraHTTPError("GetProjects", 500),
+        AjeraError("too many projects requested"),
+    )
+    for errors, expected in ((congested, len(congested)), (other, 0)):
+        gov = Governor()
+        for error in errors:
+            with pytest.raises(type(error)):
+                _call(gov, error=error)
+        assert gov.stats()["GetProjects"]["congested"] == expected
+
+
+def test_in_flight_is_capped():
+    gov = Governor(initial=2, max_limit=2)
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def work():
+        with gov.slot("GetProjects"):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+
+    threads = [threading.Thread(target=work) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert peak[0] == 2
+
+
+def test_interactive_goes_first():
+    gov = Governor(initial=1, max_limit=1)
+    order = []
+
+    def waiter(priority):
+        with gov.slot("GetProjects", priority):
+            order.append(priority)
+
+    with gov.slot("GetProjects"):
+        threads = [threading.Thread(target=waiter, args=(BULK,))]
+        threads[0].start()
+        time.sleep(0.05)
+        threads.append(threading.Thread(target=waiter, args=(INTERACTIVE,)))
+        threads[1].start()
+        time.sleep(0.05)
+    for t in threads:
+        t.join()
+    assert order == [INTERACTIVE, BULK]
+
+
+def test_bulk_waits_only_for_interactive_calls_of_its_method():
+    gov = Governor(initial=1, max_limit=1)
+    with gov.slot("GetProjects"):
+        waiting = threading.Thread(target=_call, args=(gov, "GetProjects"))
+        waiting.start()
+        time.sleep(0.05)
+        done = threading.Thread(target=_call, args=(gov, "ListProjects", None, BULK))
+        done.start()
+        done.join(1)
+        assert not done.is_alive()
+    waiting.join(5)
+
+
+@pytest.mark.parametrize("budget, admitted", [(3, True), (2, False)])
+def test_bulk_leaves_the_budget_to_interactive_calls(budget, admitted):
+    gov = Governor(initial=1, max_limit=1, calls_per_minute=budget)
+    with gov.slot("GetProjects"):  # uses one call of the budget
+        waiting = threading.Thread(target=_call, args=(gov, "GetProjects"))
+        waiting.start()
+        time.sleep(0.05)
+        bulk = threading.Thread(target=_call, args=(gov, "ListProjects", None, BULK))
+        bulk.start()
+        bulk.join(0.2)
+        assert bulk.is_alive() is not admitted
+    waiting.join(5)
+    if not admitted:
+        assert bulk.is_alive()  # the interactive call took the last one
+        with gov._cond:
+            gov._recent.clear()  # a minute later
+            gov._cond.notify_all()
+    bulk.join(5)
+    assert not bulk.is_alive()
+
+
+def test_calls_per_minute():
+    now = [1000.0]
+    gov = Governor(calls_per_minute=2, clock=lambda: now[0])
+    _call(gov)
+    _call(gov, "ListProjects")
+    blocked = threading.Thread(target=_call, args=(gov,))
+    blocked.start()
+    blocked.join(0.1)
+    assert blocked.is_alive()
+
+    now[0] += 60.0
+    with gov._cond:
+        gov._cond.notify_all()
+    blocked.join(5)
+    assert not blocked.is_alive()
+
+
+def test_ajera_governed(fake_api):
+    fake_api.project_keys = [1, 2, 3]
+    gov = Governor()
+    a = Ajera(transport=fake_api, governor=gov)
+    a.start_session()
+    a.list_projects()
+    a.get_projects_batched([1, 2, 3], chunk_size=1)
+    stats = gov.stats()
+    assert stats["ListProjects"]["calls"] == 1
+    assert stats["GetProjects"]["calls"] == 3
+    assert stats["GetProjects"]["in_flight"] == 0
+
+
+def test_batched_chunks_keep_the_callers_priority(fake_api):
+    fake_api.project_keys = [1, 2, 3]
+    priorities = []
+
+    class Recording(Governor):
+        def slot(self, method, priority=None):
+            if method == "GetProjects":
+                priorities.append(governor._PRIORITY.get())
+            return super().slot(method, priority)
+
+    a = Ajera(transport=fake_api, governor=Recording())
+    a.start_session()
+    a.get_projects_batched([1, 2, 3], chunk_size=1)
+    assert priorities == [INTERACTIVE] * 3
+    priorities.clear()
+    with bulk():
+        a.get_projects_batched([1, 2, 3], chunk_size=1)
+    assert priorities == [BULK] * 3
+
+
+def test_slot_covers_only_the_api_call(fake_api):
+    gov = Governor()
+    a = Ajera(transport=fake_api, governor=gov)
+    a.start_session()
+    fake_api.ended.add("token1")
+    a.list_projects()  # rejected, re-login outside the slot, resent
+    assert gov.stats()["ListProjects"]["calls"] == 2
+    assert "CreateAPISession" not in gov.stats()
+
+
+def test_retried_throttling_is_congestion(monkeypatch):
+    with FakeAjeraServer(SyntheticDataset(projects=5)) as server:
+        monkeypatch.setattr("ajera.model._api", lambda: server.url)
+        gov = Governor(initial=4)
+        a = Ajera(transport=Transport(backoff_factor=0), governor=gov)
+        a.start_session()
+        server.statuses = [429, 429]
+        assert len(a.list_projects().content.projects) == 5
+    stats = gov.stats()["ListProjects"]
+    assert stats["calls"] == 3 and stats["congested"] == 2
+    assert stats["limit"] < 4
@@ -0,0 +1,49 @@
+import datetime
+import pytest
+from ajera.index import ProjectIndex
+from ajera.model import GetProjectsContent
+from conftest import invoice_group, phase, project
+
+
+@pytest.fixture()
+def index():
+    projects, phases = [], []
+    for key, pm_key in ((1, 10), (2, 10), (3, 20)):
+        projects.append(project(key, pm_key))
+        phases += [phase(key, key * 100 + i, pm_key) for i in range(2)]
+    phases[-1]["Status"] = "Inactive"
+    phases[-1]["ParentKey"] = phases[-2]["PhaseKey"]
+    phases[0]["LastModifiedDate"] = "2024-01-02 08:00:00.000 GMT-05:00 (EST)"
+    content = GetProjectsContent(
+        Projects=projects,
+        Phases=phases,
+        InvoiceGroups=[invoice_group(k) for k in (1, 2, 3)],
+    )
+    return ProjectIndex(content)
+
+
+def test_filtered_lookups(index):
+    assert [p.project_key for p in index.projects(project_manager_key=10)] == [1, 2]
+    assert [p.phase_key for p in index.phases(project_manager_key=20)] == [300, 301]
+    active = index.phases(project_manager_key=[10, 20], status="Active")
+    assert [p.phase_key for p in active] == [100, 101, 200, 201, 300]
+    assert index.phases(department_key=99) == []
+    with pytest.raises(TypeError):
+        index.phases(invoice_group_description="x")
+
+
+def test_modified_window(index):
+    cutoff = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+    assert [p.phase_key for p in index.phases(modified_after=cutoff)] == [100]
+    recent = index.phases(modified_before=cutoff, project_key=1)
+    assert [p.phase_key for p in recent] == [101]
+
+
+def test_joins(index):
+    phase_ = index.phase(301)
+    assert index.project_of(phase_).project_key == 3
+    assert index.invoice_group_of(phase_).invoice_group_key == 30
+    assert [p.phase_key for p in index.phases_of(3)] == [300, 301]
+    assert [p.phase_key for p in index.children_of(300)] == [301]
+    assert [g.invoice_group_key for g in index.invoice_groups_of(2)] == [20]
+    assert index.project(4) is None
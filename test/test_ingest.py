@@ -0,0 +1,66 @@
+import pytest
+from ajera.export import export_workbooks
+from ajera.ingest import ingest_workbooks
+
+openpyxl = pytest.importorskip("openpyxl")
+
+
+def _edit(path, edits):
+    workbook = openpyxl.load_workbook(path)
+    sheet = workbook.active
+    for cell, value in edits.items():
+        sheet[cell] = value
+    workbook.save(path)
+
+
+def test_round_trip_to_update(session, fake_api, tmp_path):
+    content = session.get_projects([1, 2], track=True).content
+    (path,) = export_workbooks(content, str(tmp_path), max_workers=1).values()
+    # rows 2-5 are phases 100, 101, 200, 201
+    _edit(path, {"I2": 40, "I4": "75%", "I5": 120, "B3": 999})
+
+    changeset = ingest_workbooks([path], content.phases, max_workers=1)
+
+    assert changeset.rows == 4
+    assert [(p.phase_key, p.percent_complete) for p in changeset.changes] == [
+        (100, 40.0),
+        (200, 75.0),
+    ]
+    assert [(e.row, e.phase_key) for e in changeset.errors] == [(3, 999), (5, 201)]
+
+    session.update_projects(changeset.changes)
+    (update,) = [c for c in fake_api.calls if c["Method"] == "UpdateProjects"]
+    assert [p["PercentComplete"] for p in update["MethodArguments"]["Phases"]] == [
+        40.0,
+        75.0,
+    ]
+
+
+def test_duplicates_and_unreadable_workbooks(session, tmp_path):
+    content = session.get_projects([1]).content
+    (path,) = export_workbooks(content, str(tmp_path), max_workers=1).values()
+    broken = tmp_path / "broken.xlsx"
+    broken.write_text("not a workbook")
+
+    changeset = ingest_workbooks([path, path, str(broken)], content.phases)
+
+    assert changeset.changes == []
+    messages = [e.message for e in changeset.errors]
+    assert messages[:2] == ["PhaseKey appears in more than one row"] * 2
+    assert changeset.errors[2].path == str(broken)
+
+
+def test_percent_formatted_cells(session, tmp_path):
+    content = session.get_projects([1]).content
+    (path,) = export_workbooks(content, str(tmp_path), max_workers=1).values()
+    workbook = openpyxl.load_workbook(path)
+    workbook.active["I2"] = 0.75  # what Excel stores when 75% is typed
+    workbook.active["I2"].number_format = "0%"
+    workbook.active["I3"] = 0.5  # a plain number stays as typed
+    workbook.save(path)
+
+    changeset = ingest_workbooks([path], content.phases, max_workers=1)
+    assert [(p.phase_key, p.percent_complete) for p in changeset.changes] == [
+        (100, 75.0),
+        (101, 0.5),
+    ]
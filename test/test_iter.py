@@ -0,0 +1,49 @@
+import itertools
+import pytest
+import ajera.public
+from ajera.ajera import Ajera
+from ajera.errors import AjeraError
+from ajera.public import iter_phases, iter_projects, project_content
+from ajera.testing import FakeAjeraServer, SyntheticDataset
+
+
+def _requested(fake_api):
+    return [
+        c["MethodArguments"]["RequestedProjects"]
+        for c in fake_api.calls
+        if c["Method"] == "GetProjects"
+    ]
+
+
+def test_iter_projects_in_chunks(public_ajera, fake_api):
+    fake_api.project_keys = list(range(1, 8))
+    projects = list(iter_projects(chunk_size=3, by_status=["Active"]))
+
+    assert [p.project_key for p in projects] == list(range(1, 8))
+    assert _requested(fake_api) == [[1, 2, 3], [4, 5, 6], [7]]
+    (lp,) = [c for c in fake_api.calls if c["Method"] == "ListProjects"]
+    assert lp["MethodArguments"]["FilterByStatus"] == ["Active"]
+
+
+def test_iter_phases_is_lazy(public_ajera, fake_api):
+    fake_api.project_keys = list(range(1, 11))
+    phases = iter_phases(chunk_size=2, prefetch=1, fields=["description"])
+    first = list(itertools.islice(phases, 3))
+    phases.close()
+
+    assert [p.phase_key for p in first] == [100, 101, 200]
+    # the current chunk plus one prefetched chunk, not all five
+    assert len(_requested(fake_api)) <= 3
+
+
+def test_capped_listing_is_sharded(monkeypatch):
+    server = FakeAjeraServer(SyntheticDataset(projects=300), list_limit=50)
+    a = Ajera(transport=server)
+    a.start_session()
+    monkeypatch.setattr(ajera.public, "_AJERA", a)
+    monkeypatch.setattr(ajera.public, "_LIST_PROJECTS_LIMIT", 50)
+
+    assert len(project_content(fields=["description"]).projects) == 300
+    assert len(list(iter_projects(fields=["description"]))) == 300
+    with pytest.raises(AjeraError, match="limit of 50"):
+        project_content(by_earliest_modified_date="2000-01-01")
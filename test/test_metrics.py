@@ -0,0 +1,56 @@
+import logging
+import pytest
+from ajera import metrics
+from ajera.ajera import Ajera
+from ajera.errors import AjeraError
+
+
+@pytest.fixture()
+def stats():
+    sink = metrics.subscribe(metrics.StatsSink())
+    yield sink
+    metrics.unsubscribe(sink)
+
+
+def test_calls_are_measured(stats, fake_api):
+    fake_api.project_keys = [1, 2, 3]
+    a = Ajera(transport=fake_api)
+    a.start_session()
+    a.get_projects([1, 2, 3])
+    a.get_projects([1], decode="trusted")
+
+    summary = stats.summary()
+    assert summary["CreateAPISession"]["calls"] == 1
+    get = summary["GetProjects"]
+    assert get["calls"] == 2 and get["errors"] == 0
+    # 3 projects + 6 phases + 3 invoice groups, then 1 + 2 + 1
+    assert get["records"]["total"] == 16
+    assert get["records"]["p50"] == 4 and get["records"]["p99"] == 12
+    assert get["response_bytes"]["total"] > get["request_bytes"]["total"] > 0
+    assert get["validate_seconds"]["total"] > 0
+    assert stats.percentile("GetProjects", "records", 1.0) == 12
+
+    text = stats.prometheus()
+    assert 'ajera_calls_total{method="GetProjects"} 2' in text
+    assert 'ajera_records{method="GetProjects",quantile="0.5"} 4' in text
+    assert 'ajera_records_sum{method="GetProjects"} 16' in text
+
+
+def test_failures_and_log_sink(stats, fake_api, caplog):
+    a = Ajera(transport=fake_api)
+    a.start_session()
+    fake_api.fail["ListProjects"] = 1
+    log = metrics.subscribe(metrics.LogSink())
+    try:
+        with caplog.at_level(logging.INFO, logger="ajera"):
+            with pytest.raises(AjeraError):
+                a.list_projects()
+            a.list_projects()
+    finally:
+        metrics.unsubscribe(log)
+
+    assert stats.summary()["ListProjects"]["errors"] == 1
+    failed, ok = [r.getMessage() for r in caplog.records]
+    assert failed.startswith("ListProjects AjeraError:")
+    assert ok.startswith("ListProjects ok:")
+    assert "usage key ad3d4b0e" in ok
@@ -0,0 +1,58 @@
+import datetime
+import pytest
+from ajera.mirror import Mirror
+from ajera.testing import FakeAjeraServer, SyntheticDataset
+
+
+def test_sync_is_incremental(session, fake_api):
+    fake_api.project_keys = [1, 2, 3]
+    mirror = Mirror()
+    mirror.sync(session)
+
+    assert [p.project_key for p in mirror.projects()] == [1, 2, 3]
+    assert mirror.high_water_mark == datetime.date.today().isoformat()
+
+    fake_api.calls.clear()
+    fake_api.project_keys = [2]
+    mirror.sync(session)
+    lp, gp = [c["MethodArguments"] for c in fake_api.calls]
+    assert lp["FilterByEarliestModifiedDate"] == mirror.high_water_mark
+    assert gp["RequestedProjects"] == [2]
+    assert len(mirror.projects()) == 3
+
+
+def test_queries(session, fake_api):
+    fake_api.project_keys = [1, 2]
+    mirror = Mirror()
+    mirror.sync(session)
+
+    assert [p.phase_key for p in mirror.phases(project_key=2)] == [200, 201]
+    assert len(mirror.phases(project_manager_key=4262, status="Active")) == 4
+    assert len(mirror.projects(project_key=[1, 2])) == 2
+    assert [g.project_key for g in mirror.invoice_groups(project_key=1)] == [1]
+    assert {e.key for e in mirror.employees()} == {4262, 4263, 4264}
+    with pytest.raises(TypeError):
+        mirror.phases(description="Peer Review")
+
+
+def test_failed_sync_keeps_high_water_mark(session, fake_api):
+    from ajera.errors import AjeraBatchError
+
+    fake_api.project_keys = [1]
+    fake_api.fail["GetProjects"] = 10
+    mirror = Mirror()
+    with pytest.raises(AjeraBatchError):
+        mirror.sync(session)
+    assert mirror.high_water_mark is None
+
+
+def test_first_sync_is_not_cut_short_by_the_row_limit():
+    from ajera.ajera import Ajera
+
+    server = FakeAjeraServer(SyntheticDataset(projects=300), list_limit=50)
+    a = Ajera(transport=server)
+    a.start_session()
+    mirror = Mirror()
+    mirror.sync(a, cap=50)
+    assert len(mirror.projects()) == 300
+    assert mirror.high_water_mark is not None
@@ -0,0 +1,59 @@
+import pytest
+from ajera.model import Phase
+from ajera.public import project_data
+
+FIELDS = ["description", "project_manager", "percent_complete"]
+
+
+@pytest.mark.parametrize("decode", ["validate", "json", "trusted"])
+def test_projection_keeps_only_fields(session, decode):
+    content = session.get_projects([1], fields=FIELDS, decode=decode).content
+    phase = content.phases[0]
+    assert set(type(phase).model_fields) == {
+        "project_key",
+        "phase_key",
+        "parent_key",
+        "invoice_group_key",
+        "last_modified_date",
+        *FIELDS,
+    }
+    assert phase.description == "Phase 100"
+    assert phase.project_manager.key == 4262
+    assert not phase.model_extra
+    assert type(phase).source is Phase
+    assert set(type(content.invoice_groups[0]).model_fields) == {
+        "project_key",
+        "invoice_group_key",
+        "description",
+    }
+
+
+def test_projection_is_cached(session):
+    first = session.get_projects([1], fields=FIELDS).content.phases[0]
+    second = session.get_projects([1], fields=list(reversed(FIELDS))).content.phases[0]
+    assert type(first) is type(second)
+
+
+def test_unknown_field(session, fake_api):
+    with pytest.raises(TypeError):
+        session.get_projects([1], fields=["percent"])
+    with pytest.raises(TypeError):
+        session.get_projects_batched([1, 2], chunk_size=1, fields=["percent"])
+    assert not [c for c in fake_api.calls if c["Method"] == "GetProjects"]
+
+
+def test_projected_records_update(session, fake_api):
+    content = session.get_projects([1], fields=FIELDS, track=True).content
+    content.phases[0].percent_complete = 25.0
+    session.update_projects(content.phases)
+    (update,) = [c for c in fake_api.calls if c["Method"] == "UpdateProjects"]
+    assert update["MethodArguments"]["Phases"][0]["PercentComplete"] == 25.0
+
+
+def test_project_data_fields(public_ajera, fake_api):
+    fake_api.project_keys = [1, 2]
+    projects = project_data(fields=["id"])
+    assert [(p.project_key, p.id) for p in projects] == [
+        (1, "23-1-001"),
+        (2, "23-2-001"),
+    ]
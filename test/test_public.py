@@ -18,3 +18,21 @@ def ajera_context():
 def test_project_data(ajera_context, project_id_like):
     project_data_list = project_data(by_id_like=project_id_like)
     assert project_data_list
+
+
+def test_import_is_lazy():
+    import os
+    import subprocess
+    import sys
+
+    env = {
+        k: v
+        for k, v in os.environ.items()
+        if k not in ("AJERA_API", "AJERA_USER", "AJERA_PW")
+    }
+    code = (
+        "import sys, ajera.public, ajera.model;"
+        "assert ajera.public._AJERA is None;"
+        "assert 'requests' not in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", code], env=env, check=True)
@@ -0,0 +1,132 @@
+import datetime
+import threading
+import time
+import pytest
+from ajera.ajera import Ajera
+from ajera.decode import check_errors
+from ajera.errors import AjeraError, AjeraSessionError, AjeraUpdateError
+from ajera.session import SessionPool
+
+
+def _methods(fake_api):
+    return [c["Method"] for c in fake_api.calls]
+
+
+def test_token_requires_session(fake_api):
+    with pytest.raises(AjeraError):
+        Ajera(transport=fake_api).token
+
+
+def test_renews_before_expiry(fake_api):
+    fake_api.session_length = datetime.timedelta(minutes=1)
+    a = Ajera(transport=fake_api)
+    a.start_session()
+    assert a.token == "token2"  # token1 was already inside the renewal margin
+    assert fake_api.sessions == 2
+
+
+def test_retries_call_on_expired_token(fake_api):
+    a = Ajera(transport=fake_api)
+    a.start_session()
+    fake_api.ended.add("token1")
+    a.list_projects()
+    assert _methods(fake_api) == [
+        "CreateAPISession",
+        "ListProjects",
+        "CreateAPISession",
+        "ListProjects",
+    ]
+    assert a.token == "token2"
+
+
+def test_update_is_not_resent_on_expired_token(fake_api):
+    a = Ajera(transport=fake_api)
+    a.start_session()
+    content = a.get_projects([1], track=True).content
+    content.phases[0].percent_complete = 50.0
+    fake_api.ended.add("token1")
+    with pytest.raises(AjeraUpdateError) as e:
+        a.update_projects(content.phases, check_conflicts=False)
+    assert isinstance(e.value.error, AjeraSessionError)
+    assert _methods(fake_api)[-2:] == ["UpdateProjects", "CreateAPISession"]
+    assert a.token == "token2"
+
+
+def test_only_token_errors_renew_the_session():
+    ok = {"Errors": []}
+    check_errors(None, ok)
+    for message in ("Session has expired", "Invalid session token"):
+        with pytest.raises(AjeraSessionError):
+            check_errors(None, {"Errors": [{"ErrorMessage": message}]})
+    with pytest.raises(AjeraError) as e:
+        check_errors(None, {"Errors": [{"ErrorMessage": "Session limit reached"}]})
+    assert not isinstance(e.value, AjeraSessionError)
+
+
+def test_closing_the_pool_wakes_waiting_workers(fake_api):
+    pool = SessionPool(size=1, transport=fake_api)
+    pool.start()
+    held = pool.checkout()
+    errors = []
+
+    def wait():
+        try:
+            pool.checkout()
+        except AjeraError as e:
+            errors.append(e)
+
+    waiters = [threading.Thread(target=wait, daemon=True) for _ in range(2)]
+    for t in waiters:
+        t.start()
+    time.sleep(0.05)
+    pool.close()
+    pool.checkin(held)
+    for t in waiters:
+        t.join(2)
+    assert not any(t.is_alive() for t in waiters)
+    assert len(errors) == 2
+
+
+def test_token_file_shares_session(fake_api, tmp_path):
+    token_file = tmp_path / "session.json"
+    first = Ajera(transport=fake_api, token_file=token_file)
+    first.start_session()
+    first.close_session()  # kept open for the next process
+
+    second = Ajera(transport=fake_api, token_file=token_file)
+    second.start_session()
+    assert second.token == "token1"
+    second.close_session(end=True)
+
+    assert _methods(fake_api) == ["CreateAPISession", "EndAPISession"]
+    assert not token_file.exists()
+
+
+def test_session_pool(fake_api):
+    fake_api.project_keys = list(range(1, 9))
+    pool = SessionPool(size=3)
+    a = Ajera(transport=fake_api, pool=pool)
+    a.start_session()
+    assert _methods(fake_api).count("CreateAPISession") == 3
+
+    content = a.get_projects_batched(fake_api.project_keys, chunk_size=1)
+    assert len(content.projects) == 8
+    used = {c["SessionToken"] for c in fake_api.calls if c["Method"] == "GetProjects"}
+    assert used <= {"token1", "token2", "token3"}
+
+    held = [pool.checkout(), pool.checkout()]
+    assert len({s.token() for s in held}) == 2
+    pool.checkin(held.pop())
+    with pool.session() as s:
+        assert s.token() != held[0].token()
+        last = pool.checkout()
+        with pytest.raises(AjeraError, match="no free session"):
+            pool.checkout(timeout=0.01)
+        pool.checkin(last)
+
+    a.close_session()
+    assert _methods(fake_api).count("EndAPISession") == 2
+    pool.checkin(held[0])  # ended on return
+    assert _methods(fake_api).count("EndAPISession") == 3
+    with pytest.raises(AjeraError):
+        a.list_projects()
@@ -0,0 +1,64 @@
+import json
+import pytest
+from ajera.ajera import Ajera
+from ajera.errors import AjeraHTTPError
+from ajera.testing import FakeAjeraServer, SyntheticDataset
+from ajera.transport import Transport
+
+
+@pytest.fixture()
+def server(monkeypatch):
+    dataset = SyntheticDataset(projects=50, phases_per_project=3, padding=100)
+    with FakeAjeraServer(dataset) as server:
+        monkeypatch.setattr("ajera.model._api", lambda: server.url)
+        yield server
+
+
+def test_pull_over_http(server):
+    a = Ajera(transport=Transport())
+    a.start_session()
+    listed = a.list_projects(by_status=["Active"]).content.projects
+    assert 0 < len(listed) < 50
+
+    content = a.get_projects_batched(server.dataset.keys, chunk_size=20)
+    assert len(content.projects) == 50
+    assert len(content.phases) == server.dataset.phase_count
+    assert content.projects[0].notes == "x" * 100
+    assert server.requests == 1 + 1 + 3
+
+    a.close_session()
+    ended = server.answer({"Method": "ListProjects", "SessionToken": "token1"})
+    assert ended["Errors"] == [{"ErrorMessage": "Session has expired"}]
+
+
+def test_dataset_is_reproducible():
+    first, second = SyntheticDataset(projects=20), SyntheticDataset(projects=20)
+    args = {"RequestedProjects": first.keys}
+    assert first.get_projects(args) == second.get_projects(args)
+    assert SyntheticDataset(projects=20, seed=1).get_projects(
+        args
+    ) != first.get_projects(args)
+
+
+def test_list_limit_in_process():
+    server = FakeAjeraServer(SyntheticDataset(projects=30), list_limit=10)
+    token = server.answer({"Method": "CreateAPISession"})["Content"]["SessionToken"]
+    listed = server.post("", {"Method": "ListProjects", "SessionToken": token})
+    assert len(json.loads(listed)["Content"]["Projects"]) == 10
+    server.stop()
+
+
+def test_error_statuses(server):
+    a = Ajera(transport=Transport(backoff_factor=0))
+    server.statuses = [503]
+    with pytest.raises(AjeraHTTPError, match="CreateAPISession failed with HTTP"):
+        a.start_session()  # not resent: it changes state in Ajera
+    assert server.statuses == []
+
+    a.start_session()
+    server.statuses = [503, 429]
+    assert len(a.get_projects(server.dataset.keys[:2]).content.projects) == 2
+    server.statuses = [500] * 4
+    with pytest.raises(AjeraHTTPError) as e:
+        a.get_projects(server.dataset.keys[:2])
+    assert e.value.status_code == 500
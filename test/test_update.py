@@ -0,0 +1,95 @@
+import pytest
+from ajera.errors import AjeraConflictError, AjeraError, AjeraUpdateError
+from ajera.update import changed_fields
+
+
+def _updates(fake_api):
+    return [
+        c["MethodArguments"] for c in fake_api.calls if c["Method"] == "UpdateProjects"
+    ]
+
+
+def test_changed_fields_nested():
+    original = {"A": 1, "B": {"C": 2, "D": 3}, "E": "x"}
+    edited = {"A": 1, "B": {"C": 2, "D": 4}, "E": "y"}
+    assert changed_fields(original, edited) == {"B": {"D": 4}, "E": "y"}
+
+
+def test_update_sends_only_changed_fields(session, fake_api):
+    content = session.get_projects([1, 2], track=True).content
+    content.phases[0].percent_complete = 50.0
+    content.phases[3].custom_fields.project_notes = "late"
+    session.update_projects(content.phases)
+
+    (args,) = _updates(fake_api)
+    assert args["Projects"] == []
+    assert args["Phases"] == [
+        {
+            "ProjectKey": 1,
+            "PhaseKey": 100,
+            "LastModifiedDate": content.phases[0].last_modified_date.wire(),
+            "PercentComplete": 50.0,
+        },
+        {
+            "ProjectKey": 2,
+            "PhaseKey": 201,
+            "LastModifiedDate": content.phases[3].last_modified_date.wire(),
+            "CustomFields": {"ProjectNotes": "late"},
+        },
+    ]
+    # the tracked baseline is dropped once sent
+    with pytest.raises(AjeraError):
+        session.update_projects([content.phases[0]])
+
+
+def test_update_without_changes_sends_nothing(session, fake_api):
+    content = session.get_projects([1], track=True).content
+    assert session.update_projects(content.phases) == []
+    assert _updates(fake_api) == []
+
+
+def test_update_with_explicit_originals(session, fake_api):
+    content = session.get_projects([1]).content
+    edited = content.projects[0].model_copy(update={"status": "Hold"})
+    session.update_projects([edited], originals=content.projects)
+    (args,) = _updates(fake_api)
+    assert args["Projects"][0]["Status"] == "Hold"
+
+
+def test_update_conflict(session, fake_api):
+    content = session.get_projects([1, 2], track=True).content
+    for p in content.phases:
+        p.percent_complete = 10.0
+    fake_api.modified[2] = "2023-10-01 08:00:00.000 GMT-04:00 (Eastern Daylight Time)"
+
+    with pytest.raises(AjeraConflictError) as e:
+        session.update_projects(content.phases)
+    assert [p.phase_key for p in e.value.conflicts] == [200, 201]
+    assert _updates(fake_api) == []
+
+
+def test_update_partial_failure(session, fake_api, monkeypatch):
+    monkeypatch.setattr("ajera.update._UPDATE_PROJECTS_LIMIT", 1)
+    content = session.get_projects([1, 2], track=True).content
+    for p in content.phases:
+        p.percent_complete = 10.0
+    sent = []
+
+    def update(args, payload):
+        sent.append(args)
+        if len(sent) == 2:
+            raise OSError("connection reset")
+        return fake_api.__class__.UpdateProjects(fake_api, args, payload)
+
+    fake_api.UpdateProjects = update
+    with pytest.raises(AjeraUpdateError) as e:
+        session.update_projects(content.phases)
+    assert len(e.value.applied) == 1
+    assert [p["ProjectKey"] for p in e.value.pending[0].phases] == [2, 2]
+    assert "after 1 batch(es) were applied" in str(e.value)
+
+    # the applied batch's baseline is gone, the unsent one can be retried
+    with pytest.raises(AjeraError):
+        session.update_projects([content.phases[0]])
+    session.update_projects(content.phases[2:])
+    assert [a["Phases"][0]["ProjectKey"] for a in _updates(fake_api)] == [1, 2, 2]